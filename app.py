@@ -27,8 +27,8 @@ from ocr_engine.image_pipeline import process_image_job
 from ocr_engine.jobs import JobStore
 from ocr_engine.pdf_pipeline import process_pdf_job
 from ocr_engine.pipeline import process_job
-from ocr_engine.storage import ensure_dirs
-from ocr_engine.video_pipeline import process_video_job
+from ocr_engine.storage import ensure_dirs, ffmpeg_log_path, json_dumps
+from ocr_engine.video_pipeline import process_video_job, validate_options as validate_video_options
 
 logger = logging.getLogger(__name__)
 
@@ -206,6 +206,11 @@ def create_app():
                     path = job.get(field)
                     if path and os.path.exists(path):
                         encrypt_file(path, enc_key)
+                # The FFmpeg log a failed video job leaves behind is not
+                # tracked on the job
+                log_path = ffmpeg_log_path(settings.result_dir, job_id)
+                if os.path.exists(log_path):
+                    encrypt_file(log_path, enc_key)
         except Exception:
             raise
         finally:
@@ -216,11 +221,48 @@ def create_app():
                 except OSError:
                     pass
 
+    def _fill_result_text(data, text_path, read_text):
+        """Fill in ocr_text/final_text, which OCR results store blank.
+
+        The OCR pipeline streams the document text into the .txt file rather
+        than repeating it in the JSON: ocr_text is rebuilt from the per-page
+        text and final_text is read back from the .txt file.
+        """
+        if not data.get("ocr_text") and data.get("pages"):
+            data["ocr_text"] = "\n\n".join(page.get("text", "") for page in data["pages"])
+        if not data.get("final_text") and text_path and os.path.exists(text_path):
+            data["final_text"] = read_text(text_path)
+
+    def _load_result(job_id, job):
+        """Load a job's result JSON (decrypting if needed) with its text filled in.
+
+        Returns None if the result is encrypted and cannot be decrypted.
+        """
+        enc_key = _get_encryption_key() or key_store.get(job_id)
+        text_path = job.get("text_path")
+        if enc_key:
+            try:
+                data = json.loads(decrypt_file(job["result_path"], enc_key))
+                _fill_result_text(data, text_path, lambda path: decrypt_file(path, enc_key).decode("utf-8"))
+                return data
+            except Exception:
+                return None
+        with open(job["result_path"], "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+
+        def _read_text(path):
+            with open(path, "r", encoding="utf-8") as handle:
+                return handle.read()
+
+        _fill_result_text(data, text_path, _read_text)
+        return data
+
     def _cleanup_job_files(job_id, job):
         """Delete all on-disk artefacts for a job (upload + results + enc key)."""
-        for field in ("result_path", "text_path", "pdf_path",
-                      "image_path", "document_path", "audio_path", "video_path"):
-            path = job.get(field)
+        paths = [job.get(field) for field in ("result_path", "text_path", "pdf_path",
+                                              "image_path", "document_path", "audio_path", "video_path")]
+        paths.append(ffmpeg_log_path(settings.result_dir, job_id))
+        for path in paths:
             if path and os.path.exists(path):
                 try:
                     os.remove(path)
@@ -354,6 +396,10 @@ def create_app():
         elif job_type == "video":
             if ext not in video_ext:
                 return jsonify({"error": "unsupported file type for video conversion"}), 400
+            try:
+                validate_video_options(request.form)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
         else:
             if ext not in ocr_ext:
                 return jsonify({"error": "unsupported file type"}), 400
@@ -408,6 +454,7 @@ def create_app():
                 "job_type": "video",
                 "output_format": request.form.get("output_format", "mp4"),
                 "quality": request.form.get("quality", "medium"),
+                "force_reencode": request.form.get("force_reencode") == "true",
             }
             access_token = job_store.create_job(job_id, filename, options)
             executor.submit(_run_encrypted_pipeline, process_video_job, job_id, upload_path, options, settings, job_store)
@@ -668,15 +715,10 @@ def create_app():
         if not job["result_path"]:
             return jsonify({"error": "result not available"}), 404
 
-        enc_key = _get_encryption_key() or key_store.get(job_id)
-        if enc_key:
-            try:
-                plaintext = decrypt_file(job["result_path"], enc_key)
-                return jsonify(json.loads(plaintext))
-            except Exception:
-                return jsonify({"error": "file decryption failed — invalid or expired key"}), 403
-        with open(job["result_path"], "r", encoding="utf-8") as handle:
-            return jsonify(json.load(handle))
+        data = _load_result(job_id, job)
+        if data is None:
+            return jsonify({"error": "file decryption failed — invalid or expired key"}), 403
+        return jsonify(data)
 
     @app.route("/api/jobs/<job_id>/download/<fmt>", methods=["GET"])
     def download_result(job_id, fmt):
@@ -698,7 +740,15 @@ def create_app():
 
         if fmt == "json":
             if job["result_path"] and os.path.exists(job["result_path"]):
-                return _send_encrypted_file(job["result_path"], f"{base_name}.json", job_id)
+                # Served rebuilt rather than as stored so ocr_text/final_text
+                # are filled in, as on the result endpoint
+                data = _load_result(job_id, job)
+                if data is None:
+                    return jsonify({"error": "file decryption failed — invalid or expired key"}), 403
+                return send_file(
+                    io.BytesIO(json_dumps(data, indent=True)), as_attachment=True,
+                    download_name=f"{base_name}.json", mimetype="application/json",
+                )
             return jsonify({"error": "json file not available"}), 404
 
         if fmt == "pdf":
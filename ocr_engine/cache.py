@@ -1,12 +1,16 @@
 """OCR result cache — page-level and file-level.
 
-Two cache layers backed by a single SQLite database:
+Three cache layers backed by a single SQLite database:
 
-  page_cache  — keyed by (SHA-256 of image PNG, options hash)
+  page_cache  — keyed by (BLAKE3 or SHA-256 of image pixels, options hash)
                 stores Tesseract text + confidence + PDF bytes
                 hit = zero Tesseract subprocess calls for that page
 
-  file_cache  — keyed by (SHA-256 of file bytes, options hash)
+              — also keyed by (SHA-256 of PDF page content, options hash)
+                same payload, looked up before the page is rendered
+                hit = no rendering and no Tesseract for that page
+
+  file_cache  — keyed by (BLAKE3 or SHA-256 of file bytes, options hash)
                 stores Tika text-extraction results (text-only mode)
                 hit = zero Tika round-trips for that file
 
@@ -17,34 +21,132 @@ import hashlib
 import io
 import json
 import logging
+import mmap
+import os
+import re
 import sqlite3
 import threading
 from datetime import UTC, datetime
 from typing import Optional
 
+try:
+    import blake3 as _blake3
+except ImportError:  # hashlib fallback; blake3 is listed in requirements.txt
+    _blake3 = None
+
 logger = logging.getLogger(__name__)
 
 # Options keys that affect OCR output (used to build cache keys)
 _PAGE_OPTS_KEYS = ("ocr_engine", "lang", "psm", "oem", "preprocess")
 _FILE_OPTS_KEYS = ("mode",)
 
+# Indirect references inside PyMuPDF's xref_object() text, and the
+# back-references (/Parent, /P) that would lead the walk into the page tree.
+_PDF_REF_RE = re.compile(r"(\d+) \d+ R")
+_PDF_BACKREF_RE = re.compile(r"/(?:Parent|P)\s+\d+ \d+ R")
+_PDF_PAGE_TYPE_RE = re.compile(r"/Type\s*/Page\b")
+# Page-tree levels climbed looking for inherited /Resources; real trees are
+# a handful deep, so anything past this is a malformed or hostile file.
+_PDF_MAX_TREE_DEPTH = 64
+
 
 def hash_file(file_path: str) -> str:
-    """Return SHA-256 hex digest of a file (chunked — safe for large files)."""
-    h = hashlib.sha256()
+    """Return a hex digest of a file's bytes.
+
+    With the blake3 package installed the file is memory-mapped and hashed
+    by multithreaded BLAKE3, so large PDFs are never copied through Python.
+    Otherwise it falls back to chunked SHA-256.
+    """
     with open(file_path, "rb") as f:
+        if _blake3 is not None:
+            if os.fstat(f.fileno()).st_size == 0:
+                return _blake3.blake3(b"").hexdigest()  # mmap rejects empty files
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _blake3.blake3(mm, max_threads=_blake3.blake3.AUTO).hexdigest()
+        h = hashlib.sha256()
         for chunk in iter(lambda: f.read(65536), b""):
             h.update(chunk)
     return h.hexdigest()
 
 
 def hash_image(image) -> str:
-    """Return SHA-256 hex digest of a PIL Image using raw pixel bytes.
+    """Return a hex digest of a PIL Image using raw pixel bytes.
 
     Using tobytes() is ~5x faster than PNG-encoding the image because it skips
-    compression entirely.  The digest is still unique per image content.
+    compression entirely.  BLAKE3 (SIMD, several GB/s) is used when available,
+    SHA-256 otherwise; both are collision-resistant, which matters because the
+    page cache is shared between users.  Mode and size are mixed in so two
+    images with the same bytes but a different shape never share a key.
     """
-    return hashlib.sha256(image.tobytes()).hexdigest()
+    header = f"{image.mode}:{image.size[0]}x{image.size[1]}:".encode()
+    if _blake3 is not None:
+        h = _blake3.blake3(header, max_threads=_blake3.blake3.AUTO)
+        h.update(image.tobytes())
+        return h.hexdigest()
+    h = hashlib.sha256(header)
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+def hash_pdf_page(doc, page, render_opts: str, stream_digests: Optional[dict] = None) -> str:
+    """Return SHA-256 hex digest of everything that determines a page's render.
+
+    Covers the page geometry, its decoded content stream, its (possibly
+    inherited) /Resources and its /Annots, walking every referenced object
+    transitively.  Object numbers are dropped from the hashed text so the
+    same page in two different PDFs gets the same digest.  ``render_opts``
+    (DPI etc.) is mixed in.  ``stream_digests`` memoises raw-stream digests
+    by xref, so fonts and images shared between pages are hashed once per
+    document.  Raises ValueError if the /Parent chain loops or runs deeper
+    than _PDF_MAX_TREE_DEPTH, so such a page simply gets no cache key.
+    """
+    if stream_digests is None:
+        stream_digests = {}
+    h = hashlib.sha256()
+    h.update(render_opts.encode())
+    h.update(repr((tuple(page.mediabox), tuple(page.cropbox), page.rotation)).encode())
+    h.update(page.read_contents())
+
+    roots = []
+    node = page.xref
+    parents = set()
+    while node:
+        if node in parents or len(parents) >= _PDF_MAX_TREE_DEPTH:
+            raise ValueError(f"page tree above xref {page.xref} loops or is too deep")
+        parents.add(node)
+        kind, value = doc.xref_get_key(node, "Resources")
+        if kind != "null":
+            roots.append(value)
+            break
+        kind, value = doc.xref_get_key(node, "Parent")
+        node = int(value.split()[0]) if kind == "xref" else 0
+    kind, value = doc.xref_get_key(page.xref, "Annots")
+    if kind != "null":
+        roots.append(value)
+
+    seen = set()
+    stack = list(reversed(roots))
+    while stack:
+        text = _PDF_BACKREF_RE.sub("", stack.pop())
+        h.update(_PDF_REF_RE.sub("R", text).encode())
+        children = []
+        for match in _PDF_REF_RE.finditer(text):
+            xref = int(match.group(1))
+            if xref in seen:
+                continue
+            seen.add(xref)
+            if doc.xref_is_stream(xref):
+                digest = stream_digests.get(xref)
+                if digest is None:
+                    digest = stream_digests[xref] = hashlib.sha256(
+                        doc.xref_stream_raw(xref)
+                    ).digest()
+                h.update(digest)
+            obj = doc.xref_object(xref, compressed=True)
+            # Link destinations point at other pages; don't hash their content
+            children.append("/Page" if _PDF_PAGE_TYPE_RE.search(obj) else obj)
+        stack.extend(reversed(children))
+    return h.hexdigest()
 
 
 def hash_options(options: dict, keys=_PAGE_OPTS_KEYS) -> str:
@@ -116,7 +218,23 @@ class OcrCache:
 
     def get_page(self, image_hash: str, options_hash: str) -> Optional[dict]:
         """Return cached OCR result dict, or None on a miss."""
-        key = f"p:{image_hash}:{options_hash}"
+        return self._get_page_entry(f"p:{image_hash}:{options_hash}")
+
+    def set_page(self, image_hash: str, options_hash: str, ocr_result: dict) -> None:
+        """Store an OCR result in the page cache."""
+        self._set_page_entry(f"p:{image_hash}:{options_hash}", ocr_result)
+
+    # ── Rendered-page cache (PDF page content, checked before rendering) ──────
+
+    def get_rendered(self, content_hash: str, options_hash: str) -> Optional[dict]:
+        """Return the cached OCR result for a PDF page's content, or None."""
+        return self._get_page_entry(f"r:{content_hash}:{options_hash}")
+
+    def set_rendered(self, content_hash: str, options_hash: str, ocr_result: dict) -> None:
+        """Store an OCR result under a PDF page's content hash."""
+        self._set_page_entry(f"r:{content_hash}:{options_hash}", ocr_result)
+
+    def _get_page_entry(self, key: str) -> Optional[dict]:
         now = self._now()
         with self._lock, self._connect() as conn:
             row = conn.execute(
@@ -138,9 +256,7 @@ class OcrCache:
                 return {"text": row[0], "engine": "tesseract", "detail": detail}
         return None
 
-    def set_page(self, image_hash: str, options_hash: str, ocr_result: dict) -> None:
-        """Store an OCR result in the page cache."""
-        key = f"p:{image_hash}:{options_hash}"
+    def _set_page_entry(self, key: str, ocr_result: dict) -> None:
         now = self._now()
         detail = ocr_result.get("detail", {}) or {}
         text = ocr_result.get("text", "")
@@ -4,6 +4,8 @@ import os
 import threading
 from datetime import UTC, datetime, timedelta
 
+from .storage import ffmpeg_log_path
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,9 +23,14 @@ def _run_cleanup(settings, job_store, key_store=None):
         except OSError:
             logger.warning("failed to remove %s", path)
 
-    # Remove upload files for those jobs (pattern: <job_id>-<filename>)
+    # Remove upload files for those jobs (pattern: <job_id>-<filename>),
+    # plus the FFmpeg log, which is not tracked in the database
     for job_id in job_ids:
-        for path in glob.glob(os.path.join(settings.upload_dir, f"{job_id}-*")):
+        extra = glob.glob(os.path.join(settings.upload_dir, f"{job_id}-*"))
+        extra.append(ffmpeg_log_path(settings.result_dir, job_id))
+        for path in extra:
+            if not os.path.exists(path):
+                continue
             try:
                 os.remove(path)
                 removed += 1
@@ -18,6 +18,36 @@ class Settings:
         # Phase 3 — intra-job page parallelism
         self.ocr_page_workers = int(os.environ.get("OCR_PAGE_WORKERS", "2"))
         self.ocr_batch_size = int(os.environ.get("OCR_BATCH_SIZE", "10"))
+        # Processes for pages using the CPU-heavy "aggressive" preprocess profile
+        # (0 = run them on the page thread pool like the other profiles).
+        # Defaults to OCR_PAGE_WORKERS so the pages in flight per job, and
+        # with them peak RAM, stay what that setting was tuned for
+        self.ocr_page_proc_workers = int(
+            os.environ.get("OCR_PAGE_PROC_WORKERS", str(self.ocr_page_workers))
+        )
+        # Render blank pages as a preview only and sparse pages at 200 DPI
+        self.ocr_adaptive_dpi = (
+            os.environ.get("OCR_ADAPTIVE_DPI", "0").strip().lower()
+            in ("1", "true", "yes")
+        )
+        # Video encoding: "auto" uses a hardware H.264 encoder when one works on
+        # this host, "nvenc" / "qsv" / "vaapi" request one backend, "none" forces software
+        self.video_hwaccel = os.environ.get("VIDEO_HWACCEL", "auto").strip().lower()
+        # Upper bound in seconds on one FFmpeg encode; the limit for a job is
+        # 8x its input duration, clamped between 60 s and this value
+        self.video_max_timeout = int(os.environ.get("VIDEO_MAX_TIMEOUT", "3600"))
+        # Video inputs up to this size are staged on /dev/shm for the encode
+        # when it has room (0 = always encode in place; opt-in because
+        # Docker's default /dev/shm is only 64 MB)
+        self.video_tmpfs_max_mb = int(os.environ.get("VIDEO_TMPFS_MAX_MB", "0"))
+        # Encoder threads per FFmpeg process; the default splits the CPUs
+        # between the WORKER_COUNT jobs that can encode at once
+        self.ffmpeg_threads = int(
+            os.environ.get(
+                "FFMPEG_THREADS",
+                str(max(2, (os.cpu_count() or 2) // max(1, self.worker_count))),
+            )
+        )
         # Phase 5 — result caching
         self.ocr_cache_enabled = (
             os.environ.get("OCR_CACHE_ENABLED", "1").strip().lower()
@@ -1,11 +1,18 @@
+import logging
 import os
 import re
 import subprocess
 import tempfile
+import threading
 from dataclasses import dataclass
 
 from .ocr_preprocess import preprocess_for_ocr
 
+logger = logging.getLogger(__name__)
+
+# Per-thread tesserocr handles, keyed by (lang, oem); see _tesserocr_api()
+_TESS_LOCAL = threading.local()
+
 
 @dataclass
 class OcrResult:
@@ -26,12 +33,46 @@ def _load_tesseract():
     return pytesseract
 
 
+def _tesserocr_api(lang, oem):
+    """Return this thread's libtesseract handle for ``(lang, oem)``, or None.
+
+    tesserocr keeps the language model loaded between pages, so each page
+    costs only recognition instead of a tesseract process launch plus model
+    load.  Handles are per thread (the C API is not thread-safe) and per
+    (lang, oem), which are fixed at Init; psm is set per call.  Returns None
+    when tesserocr is not installed or the model cannot be loaded, and the
+    caller falls back to the tesseract CLI.
+    """
+    apis = getattr(_TESS_LOCAL, "apis", None)
+    if apis is None:
+        apis = _TESS_LOCAL.apis = {}
+    key = (lang, oem)
+    if key not in apis:
+        try:
+            import tesserocr
+
+            api = tesserocr.PyTessBaseAPI(lang=lang, oem=oem)
+            for output in ("pdf", "hocr", "txt"):
+                api.SetVariable(f"tessedit_create_{output}", "1")
+            apis[key] = api
+        except ImportError:
+            apis[key] = None
+        except Exception as exc:
+            logger.warning(
+                "tesserocr init failed for lang=%s oem=%s, using tesseract CLI: %s",
+                lang, oem, exc,
+            )
+            apis[key] = None
+    return apis[key]
+
+
 def run_tesseract(image, lang="eng", psm=6, oem=1, preprocess="standard", deskew=True):
-    """Run Tesseract OCR on an image using a single subprocess call.
+    """Run Tesseract OCR on an image, producing text, hOCR and PDF in one pass.
 
-    Tesseract is invoked once with pdf+hocr+txt output types, producing all
-    three artefacts in one process launch instead of three separate calls.
-    This eliminates ~60% of the per-page subprocess overhead.
+    With tesserocr installed the page goes through this thread's persistent
+    libtesseract handle (see _tesserocr_api); otherwise tesseract is invoked
+    once with pdf+hocr+txt output types, producing all three artefacts in one
+    process launch instead of three separate calls.
 
     Args:
         image: PIL Image object
@@ -47,6 +88,10 @@ def run_tesseract(image, lang="eng", psm=6, oem=1, preprocess="standard", deskew
     pytesseract = _load_tesseract()
 
     image = preprocess_for_ocr(image, profile=preprocess, deskew=deskew)
+    # Carry the render resolution through to the TIFF so Tesseract sizes the
+    # PDF page correctly even when pages were rendered at different DPIs.
+    # Read after preprocessing, which doubles it when it upscales the page.
+    dpi = image.info.get("dpi")
 
     # Resolve the configured tesseract binary path (respects pytesseract.pytesseract.tesseract_cmd)
     tesseract_cmd = getattr(pytesseract.pytesseract, "tesseract_cmd", "tesseract")
@@ -57,17 +102,27 @@ def run_tesseract(image, lang="eng", psm=6, oem=1, preprocess="standard", deskew
         img_path = os.path.join(tmpdir, "input.tiff")
         out_base = os.path.join(tmpdir, "output")
 
-        image.save(img_path, format="TIFF")
-
-        # Single subprocess: generate txt + pdf + hocr in one pass
-        cmd = [
-            tesseract_cmd, img_path, out_base,
-            "-l", lang,
-            "--oem", str(oem),
-            "--psm", str(psm),
-            "pdf", "hocr", "txt",
-        ]
-        subprocess.run(cmd, capture_output=True, check=False)
+        if dpi:
+            image.save(img_path, format="TIFF", dpi=dpi)
+        else:
+            image.save(img_path, format="TIFF")
+
+        api = _tesserocr_api(lang, oem)
+        if api is not None:
+            # Same renderers as the CLI; the PDF renderer embeds img_path
+            api.SetPageSegMode(psm)
+            api.SetVariable("user_defined_dpi", str(int(dpi[0])) if dpi else "0")
+            api.ProcessPage(out_base, image, 0, img_path)
+        else:
+            # Single subprocess: generate txt + pdf + hocr in one pass
+            cmd = [
+                tesseract_cmd, img_path, out_base,
+                "-l", lang,
+                "--oem", str(oem),
+                "--psm", str(psm),
+                "pdf", "hocr", "txt",
+            ]
+            subprocess.run(cmd, capture_output=True, check=False)
 
         # Read plain text
         txt_path = out_base + ".txt"
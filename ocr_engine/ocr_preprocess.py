@@ -6,7 +6,6 @@ Profiles:
   aggressive — standard + upscale if low-res + denoise + sharpen
 """
 
-import io
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,16 +22,20 @@ def preprocess_for_ocr(image, profile="standard", deskew=True):
         image: PIL Image object (any mode)
         profile: "none", "standard", or "aggressive"
         deskew: Whether to run deskew correction (disable for digital/native PDFs
-                to skip the expensive PIL→Wand→PNG→PIL round-trip)
+                to skip the expensive PIL→Wand→PIL round-trip)
 
     Returns:
-        Preprocessed PIL Image (mode "L" — grayscale)
+        Preprocessed PIL Image (mode "L" — grayscale).  A resolution in the
+        input's ``info["dpi"]`` is carried over, doubled if the image was
+        upscaled, so it still matches the returned pixels.
     """
     if profile == "none":
         return image
 
     from PIL import ImageFilter, ImageOps
 
+    dpi = image.info.get("dpi")
+
     # ── Step 1: Grayscale ─────────────────────────────────────────
     if image.mode != "L":
         image = image.convert("L")
@@ -44,17 +47,15 @@ def preprocess_for_ocr(image, profile="standard", deskew=True):
         new_h = image.height * 2
         image = image.resize((new_w, new_h), resample=PilImage.LANCZOS)
         logger.info("Upscaled low-res image 2x to %dx%d", new_w, new_h)
+        if dpi:
+            dpi = (dpi[0] * 2, dpi[1] * 2)
 
     # ── Step 3: Deskew (standard + aggressive) ────────────────────
     # Skip for native digital PDFs — they don't have scan skew and the
-    # PIL→Wand→PNG→PIL round-trip costs ~100-200 ms per page for nothing.
+    # PIL→Wand→PIL round-trip costs ~100-200 ms per page for nothing.
     if deskew:
         try:
             image = _deskew(image)
-            # Wand's PNG round-trip can return mode "1" (1-bit binary);
-            # autocontrast and filters require mode "L".
-            if image.mode != "L":
-                image = image.convert("L")
         except Exception as exc:
             logger.warning("Deskew failed, skipping: %s", exc)
 
@@ -72,35 +73,41 @@ def preprocess_for_ocr(image, profile="standard", deskew=True):
             ImageFilter.UnsharpMask(radius=1, percent=150, threshold=3)
         )
 
+    if dpi:
+        image.info["dpi"] = dpi
     return image
 
 
 def _deskew(pil_image):
     """Correct document skew using Wand's deskew algorithm.
 
-    Converts PIL → Wand, applies deskew, returns a new PIL image.
-    Wand uses a background-colour flood-fill approach; it works best
-    on white-background scanned documents.
+    Hands the raw 8-bit grayscale pixels to Wand and reads raw pixels back,
+    so no PNG encode/decode (two compressions of a ~8 MB page) is paid on
+    either side.  Wand uses a background-colour flood-fill approach; it works
+    best on white-background scanned documents.
 
     Args:
-        pil_image: PIL Image (mode "L" recommended)
+        pil_image: PIL Image (converted to mode "L" if needed)
 
     Returns:
-        Deskewed PIL Image
+        Deskewed PIL Image (mode "L")
     """
     from wand.image import Image as WandImage
     from PIL import Image as PilImage
 
-    buf = io.BytesIO()
-    pil_image.save(buf, format="PNG")
-    buf.seek(0)
+    if pil_image.mode != "L":
+        pil_image = pil_image.convert("L")
 
-    with WandImage(blob=buf.read()) as wand_img:
+    with WandImage(
+        blob=pil_image.tobytes(), format="gray",
+        width=pil_image.width, height=pil_image.height, depth=8,
+    ) as wand_img:
         # threshold is an absolute value; 40% of quantum_range is the
         # standard recommendation in the Wand / ImageMagick docs.
         threshold = 0.4 * wand_img.quantum_range
         wand_img.deskew(threshold)
-        out_blob = wand_img.make_blob("PNG")
+        wand_img.depth = 8
+        size = (wand_img.width, wand_img.height)
+        out_blob = wand_img.make_blob("gray")
 
-    result = PilImage.open(io.BytesIO(out_blob))
-    return result.copy()
+    return PilImage.frombytes("L", size, out_blob)
@@ -26,31 +26,79 @@ def write_text_pdf(output_path, title, text):
     pdf.save()
 
 
+def _concat_page_pdfs(output_path, title, page_pdf_bytes):
+    """Concatenate per-page Tesseract PDFs with pikepdf (qpdf).
+
+    Page objects and their streams are copied as-is, with no image
+    re-encoding.  Returns False if pikepdf is not installed or any page
+    cannot be read, so the caller can fall back to the pypdf path.
+    """
+    import logging
+    logger = logging.getLogger(__name__)
+
+    try:
+        import pikepdf
+    except ImportError:
+        return False
+
+    sources = []
+    try:
+        pdf = pikepdf.Pdf.new()
+        for page_bytes in page_pdf_bytes:
+            # Sources stay open until save: copied streams are read lazily
+            source = pikepdf.Pdf.open(io.BytesIO(page_bytes))
+            sources.append(source)
+            pdf.pages.extend(source.pages)
+        pdf.docinfo[pikepdf.Name.Title] = title
+        pdf.save(output_path, linearize=False, compress_streams=False)
+    except Exception as exc:
+        logger.warning(f"pikepdf concatenation failed, falling back to pypdf: {exc}")
+        return False
+    finally:
+        for source in sources:
+            source.close()
+
+    logger.info(f"PDF written to {output_path} ({len(page_pdf_bytes)} Tesseract pages)")
+    return True
+
+
 def write_ocr_pdf_from_images(output_path, title, images, page_texts, page_pdf_bytes=None):
     """Create a PDF with images and overlaid OCR text.
     
+    Pages with Tesseract PDF bytes are copied as-is; only pages without them
+    are built from their image plus an invisible text layer.  When every page
+    has Tesseract PDF bytes they are concatenated with pikepdf if available.
+    
     Args:
         output_path: Path where PDF will be saved
         title: PDF document title
-        images: List of PIL Image objects
+        images: List of PIL Image objects, one per page; entries may be None
+                for pages that have Tesseract PDF bytes
         page_texts: List of text strings (one per page/image)
+        page_pdf_bytes: Optional list of per-page Tesseract PDF bytes
     """
     import logging
     logger = logging.getLogger(__name__)
     
-    if not images:
+    page_pdf_bytes = page_pdf_bytes or []
+    page_count = max(len(images or []), len(page_pdf_bytes))
+    if not page_count:
         # Fallback to text-only PDF if no images
         write_text_pdf(output_path, title, "\n\n".join(page_texts) if page_texts else "")
         return
     
-    logger.info(f"Creating PDF with {len(images)} images and {len(page_texts)} page texts")
+    if len(page_pdf_bytes) == page_count and all(page_pdf_bytes):
+        if _concat_page_pdfs(output_path, title, page_pdf_bytes):
+            return
+
+    logger.info(f"Creating PDF with {page_count} pages and {len(page_texts)} page texts")
     for idx, text in enumerate(page_texts):
         logger.info(f"Page {idx + 1} text length: {len(text)} chars, preview: {text[:100] if text else '(empty)'}")
     
     writer = PdfWriter()
 
-    for index, image in enumerate(images):
-        if page_pdf_bytes and index < len(page_pdf_bytes) and page_pdf_bytes[index]:
+    for index in range(page_count):
+        if index < len(page_pdf_bytes) and page_pdf_bytes[index]:
             try:
                 tesseract_reader = PdfReader(io.BytesIO(page_pdf_bytes[index]))
                 if tesseract_reader.pages:
@@ -59,6 +107,11 @@ def write_ocr_pdf_from_images(output_path, title, images, page_texts, page_pdf_b
             except Exception:
                 logger.warning(f"Page {index + 1}: Failed to use Tesseract PDF bytes, falling back to overlay")
 
+        image = images[index] if images and index < len(images) else None
+        if image is None:
+            logger.warning(f"Page {index + 1}: No image or Tesseract PDF available, skipping page")
+            continue
+
         # Ensure image is in compatible mode
         if image.mode not in ("RGB", "L"):
             image = image.convert("RGB")
@@ -1,141 +1,440 @@
+import atexit
+import ctypes
 import gc
-import mimetypes
+import multiprocessing as _mp
 import os
 import queue as _queue
 import threading as _threading
+import time
 import traceback
 import logging
-from concurrent.futures import ThreadPoolExecutor as _PageExecutor, as_completed as _as_completed
-
-from .cache import OcrCache, hash_file, hash_image, hash_options, _PAGE_OPTS_KEYS, _FILE_OPTS_KEYS
+from concurrent.futures import (
+    Future as _Future,
+    ProcessPoolExecutor as _PageProcExecutor,
+    ThreadPoolExecutor as _PageExecutor,
+    as_completed as _as_completed,
+)
+from concurrent.futures.process import BrokenProcessPool as _BrokenProcessPool
+
+from .cache import (
+    OcrCache, hash_file, hash_image, hash_options, hash_pdf_page, _PAGE_OPTS_KEYS, _FILE_OPTS_KEYS,
+)
 from .ocr import open_image, run_tesseract
 from .pdf_output import write_ocr_pdf_from_images, write_text_pdf
-from .storage import result_paths
-from .tika_client import TikaClient
+from .storage import atomic_open, json_dumps, result_paths
+from .tika_client import shared_client as _shared_tika_client
 
 # Configure logger
 logger = logging.getLogger(__name__)
 
+# Adaptive rendering: a cheap preview pass measures how much of each page is
+# ink, so empty pages skip OCR and sparse ones render at a lower DPI.  Only a
+# handful of dark preview pixels (dust, a stray speck) counts as blank: a
+# single heading or signature line is sparse, not blank, and still gets OCR.
+_PREVIEW_DPI = 72
+_BLANK_INK_PIXELS = 4
+_SPARSE_INK_RATIO = 0.03
+_SPARSE_DPI = 200
+
+# Pages rendered between PyMuPDF document reopens (bounds MuPDF's store)
+_PDF_REOPEN_INTERVAL = 50
+
+# RSS growth (bytes) since the last full collection that triggers another
+_RSS_COLLECT_GROWTH = 500 << 20
+
+# Image extensions OCR'd directly (matched by suffix, no MIME database lookup)
+_IMAGE_EXTS = frozenset({".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".gif", ".webp"})
+
+
+def _load_malloc_trim():
+    try:
+        return ctypes.CDLL("libc.so.6").malloc_trim
+    except (OSError, AttributeError):
+        return None
+
+
+_MALLOC_TRIM = _load_malloc_trim()
+
+
+def _current_rss():
+    """Return this process's resident set size in bytes (Linux), else None."""
+    try:
+        with open("/proc/self/statm", "rb") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _collect_if_grown(baseline):
+    """Run a full collection only if RSS grew past _RSS_COLLECT_GROWTH.
+
+    gc.collect() walks every tracked object, so it is skipped while memory
+    is flat.  When it does run, freed arenas are trimmed too.  MuPDF's
+    store is left alone: it is not thread-safe to shrink while the render
+    producer is inside MuPDF, and the producer shrinks it whenever it
+    reopens the document.  Returns the RSS to use as the next baseline.
+    """
+    rss = _current_rss()
+    if rss is None or baseline is None or rss - baseline <= _RSS_COLLECT_GROWTH:
+        return baseline if baseline is not None else rss
+    gc.collect()
+    _release_memory()
+    logger.info("RSS grew %d MiB; ran a full collection", (rss - baseline) >> 20)
+    return _current_rss()
+
+
+def _release_memory():
+    """Hand freed heap arenas back to the OS (glibc only; no-op elsewhere).
+
+    Page images are freed by refcounting as soon as they are dropped, but
+    glibc keeps the pages in its arenas, so RSS only falls after a trim.
+    This is far cheaper than a full gc.collect() walk of the object graph.
+    """
+    if _MALLOC_TRIM is not None:
+        _MALLOC_TRIM(0)
+
+
+# Render-queue message tags (producer → consumer).  Every message is a
+# (tag, payload) tuple; _RENDER_DONE is always the last one sent.
+_RENDER_PAGE, _RENDER_CACHED, _RENDER_ERROR, _RENDER_DONE = 0, 1, 2, 3
+
+# Process-wide page executors shared by every OCR job (created on first use).
+_SHARED_PAGE_EXEC = None
+_SHARED_PAGE_PROC_EXEC = None
+_SHARED_PAGE_EXEC_LOCK = _threading.Lock()
+# Page processes need a forkserver (see _get_page_proc_executor)
+_PROC_POOL_AVAILABLE = "forkserver" in _mp.get_all_start_methods()
+
+
+def _get_page_executor(settings):
+    """Return the process-wide page executor, creating it on first use.
+
+    A single pool is shared across jobs instead of spinning one up per job,
+    so worker threads (and the Tesseract data they pull into the page cache)
+    stay warm between jobs.  It is sized for ``worker_count`` concurrent jobs
+    each using ``ocr_page_workers`` pages in flight, matching the capacity of
+    the old per-job pools.
+    """
+    global _SHARED_PAGE_EXEC
+    if _SHARED_PAGE_EXEC is None:
+        with _SHARED_PAGE_EXEC_LOCK:
+            if _SHARED_PAGE_EXEC is None:
+                page_workers = getattr(settings, "ocr_page_workers", 2)
+                job_workers = getattr(settings, "worker_count", 1)
+                max_workers = max(1, page_workers * job_workers)
+                _SHARED_PAGE_EXEC = _PageExecutor(
+                    max_workers=max_workers, thread_name_prefix="ocr-page"
+                )
+                atexit.register(_SHARED_PAGE_EXEC.shutdown, wait=False, cancel_futures=True)
+                logger.info("Shared OCR page executor started with %d worker(s)", max_workers)
+    return _SHARED_PAGE_EXEC
+
+
+def _get_page_proc_executor(settings):
+    """Return the process-wide page process pool, creating it on first use.
+
+    Used for the "aggressive" preprocess profile, whose Python-side image
+    work is CPU-bound and would otherwise contend for the GIL.  Workers come
+    from a forkserver so they never inherit the parent's threads or open
+    SQLite handles.  The forkserver preloads only this module: the default
+    ``__main__`` preload would re-import app.py and run create_app() again.
+    Spawn is not used as a fallback because every spawned child re-imports
+    ``__main__`` the same way; callers check _PROC_POOL_AVAILABLE instead.
+    """
+    global _SHARED_PAGE_PROC_EXEC
+    if _SHARED_PAGE_PROC_EXEC is None:
+        with _SHARED_PAGE_EXEC_LOCK:
+            if _SHARED_PAGE_PROC_EXEC is None:
+                max_workers = max(1, getattr(settings, "ocr_page_proc_workers", 2))
+                ctx = _mp.get_context("forkserver")
+                ctx.set_forkserver_preload([__name__])
+                _SHARED_PAGE_PROC_EXEC = _PageProcExecutor(
+                    max_workers=max_workers, mp_context=ctx
+                )
+                atexit.register(_SHARED_PAGE_PROC_EXEC.shutdown, wait=False, cancel_futures=True)
+                logger.info(
+                    "Shared OCR page process pool started with %d worker(s)", max_workers
+                )
+    return _SHARED_PAGE_PROC_EXEC
+
+
+def _discard_page_proc_executor(executor):
+    """Drop ``executor`` as the shared page process pool after it broke.
+
+    A ProcessPoolExecutor whose child died (OOM kill, crash) rejects every
+    later submit with BrokenProcessPool; the submitter discards it so the
+    next _get_page_proc_executor() call starts a fresh pool instead of
+    failing all future "aggressive" jobs.
+    """
+    global _SHARED_PAGE_PROC_EXEC
+    with _SHARED_PAGE_EXEC_LOCK:
+        if _SHARED_PAGE_PROC_EXEC is executor:
+            _SHARED_PAGE_PROC_EXEC = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+class _InlineExecutor:
+    """Executor stand-in that runs each task in the calling thread.
+
+    Used when a job has a single page worker: there is nothing to
+    parallelise, so pages skip the hand-off to the shared pool.  Rendering
+    still overlaps OCR because the producer has its own thread.
+    """
+
+    @staticmethod
+    def submit(fn, *args):
+        future = _Future()
+        try:
+            future.set_result(fn(*args))
+        except BaseException as exc:
+            future.set_exception(exc)
+        return future
+
 
 def _ocr_page_task(args):
     """Parallel-safe per-page OCR worker with page-level cache support.
 
     Args:
-        args: tuple of (idx, image, engine, lang, psm, oem, preprocess, deskew,
-                        cache, page_opts_hash)
-              cache and page_opts_hash may both be None when caching is disabled.
+        args: tuple of (idx, image, image_hash, render_key, engine, lang, psm,
+                        oem, preprocess, deskew, cache, page_opts_hash)
+              image_hash and render_key (PDF page content hash) are computed
+              by the render producer; they, cache and page_opts_hash are all
+              None when caching is disabled.
 
     Returns:
         tuple of (idx, ocr_result_dict, error_msg_or_None)
     """
-    idx, image, engine, lang, psm, oem, preprocess, deskew, cache, page_opts_hash = args
+    (idx, image, image_hash, render_key, engine, lang, psm, oem,
+     preprocess, deskew, cache, page_opts_hash) = args
+
+    early = _ocr_page_precheck(idx, image, image_hash, render_key, engine, cache, page_opts_hash)
+    if early is not None:
+        return early
+
+    # ── Cache miss — run Tesseract ────────────────────────────────────────────
+    idx, ocr_text, error_msg = _ocr_page_run((idx, image, engine, lang, psm, oem, preprocess, deskew))
+
+    # ── Store result in page cache ────────────────────────────────────────────
+    if image_hash is not None and not error_msg:
+        _ocr_page_store(cache, image_hash, render_key, page_opts_hash, ocr_text)
+
+    return idx, ocr_text, error_msg
+
+
+def _ocr_page_precheck(idx, image, image_hash, render_key, engine, cache, page_opts_hash):
+    """Return the page's result tuple if it needs no OCR, else None."""
+    # Pages flagged blank by the adaptive renderer have nothing to recognise
+    if image.info.get("blank"):
+        logger.info("Page %d: blank (skipping Tesseract)", idx)
+        return idx, {"text": "", "engine": engine, "detail": {"confidence": 0.0, "blank": True}}, None
 
     # ── Page cache check ──────────────────────────────────────────────────────
-    image_hash = None
-    if cache is not None:
-        image_hash = hash_image(image)
+    if image_hash is not None:
         cached = cache.get_page(image_hash, page_opts_hash)
         if cached is not None:
             logger.info("Page %d: cache HIT (skipping Tesseract)", idx)
+            _set_rendered(cache, render_key, page_opts_hash, cached)
             return idx, cached, None
+    return None
 
-    # ── Cache miss — run Tesseract ────────────────────────────────────────────
+
+def _ocr_page_run(args):
+    """Preprocess and OCR one page; no cache access, so it can run in a child process.
+
+    Args:
+        args: tuple of (idx, image, engine, lang, psm, oem, preprocess, deskew)
+
+    Returns:
+        tuple of (idx, ocr_result_dict, error_msg_or_None)
+    """
+    idx, image, engine, lang, psm, oem, preprocess, deskew = args
     local_errors = []
     local_result = {"errors": local_errors}
     ocr_text = _run_ocr_engine(
         image, engine, local_result,
         lang=lang, psm=psm, oem=oem, preprocess=preprocess, deskew=deskew,
     )
-    error_msg = local_errors[0] if local_errors else None
+    return idx, ocr_text, (local_errors[0] if local_errors else None)
 
-    # ── Store result in page cache ────────────────────────────────────────────
-    if cache is not None and not error_msg:
-        if image_hash is None:
-            image_hash = hash_image(image)
-        cache.set_page(image_hash, page_opts_hash, ocr_text)
 
-    return idx, ocr_text, error_msg
+def _ocr_page_store(cache, image_hash, render_key, page_opts_hash, ocr_text):
+    cache.set_page(image_hash, page_opts_hash, ocr_text)
+    _set_rendered(cache, render_key, page_opts_hash, ocr_text)
 
 
-def _is_pdf(file_path):
-    return os.path.splitext(file_path)[1].lower() == ".pdf"
+def _submit_page_proc(proc_exec, args):
+    """Submit an ``_ocr_page_task`` args tuple to the page process pool.
 
+    The cache holds a lock and SQLite handles, so it cannot be pickled into
+    the child: the blank/cache check runs here before submitting, and the
+    result is stored from a done-callback back in this process.  Images
+    travel as pickled PIL images (raw pixel bytes plus ``info``, so the
+    render DPI survives).
+    """
+    (idx, image, image_hash, render_key, engine, lang, psm, oem,
+     preprocess, deskew, cache, page_opts_hash) = args
+
+    early = _ocr_page_precheck(idx, image, image_hash, render_key, engine, cache, page_opts_hash)
+    if early is not None:
+        future = _Future()
+        future.set_result(early)
+        return future
 
-def _has_embedded_text(file_path, min_chars=100):
+    future = proc_exec.submit(
+        _ocr_page_run, (idx, image, engine, lang, psm, oem, preprocess, deskew)
+    )
+    if image_hash is not None:
+        def _store(done):
+            if done.cancelled() or done.exception() is not None:
+                return
+            _, ocr_text, error_msg = done.result()
+            if not error_msg:
+                _ocr_page_store(cache, image_hash, render_key, page_opts_hash, ocr_text)
+        future.add_done_callback(_store)
+    return future
+
+
+def _set_rendered(cache, render_key, page_opts_hash, ocr_result):
+    # Only results carrying Tesseract PDF bytes can stand in for a render:
+    # without them the output PDF would have nothing to show for the page.
+    if render_key is not None and (ocr_result.get("detail") or {}).get("tesseract_pdf"):
+        cache.set_rendered(render_key, page_opts_hash, ocr_result)
+
+
+def _open_pdf(file_path):
+    """Open a PDF with PyMuPDF, returning None if it cannot be opened.
+
+    The same handle serves scan detection, the page count and rendering, so
+    the file is parsed once.  On failure the renderer reopens the file itself
+    and reports the error through the normal render-error path.
+    """
+    try:
+        import fitz
+        return fitz.open(file_path)
+    except Exception as exc:
+        logger.warning("Could not open PDF with PyMuPDF: %s", exc)
+        return None
+
+
+def _has_embedded_text(doc, min_chars=100):
     """Return True if the PDF has extractable text (i.e. digital, not scanned).
 
-    Checks the first three pages for at least min_chars of real text.  If found,
-    the document is a native digital PDF and deskew can be safely skipped.
+    Checks the first three pages of an open PyMuPDF document for at least
+    min_chars of real text.  If found, the document is a native digital PDF
+    and deskew can be safely skipped.
     """
     try:
-        from pypdf import PdfReader
-        reader = PdfReader(file_path)
-        for page in reader.pages[:3]:
-            if len((page.extract_text() or "").strip()) >= min_chars:
+        for pno in range(min(3, doc.page_count)):
+            if len(doc[pno].get_text("text").strip()) >= min_chars:
                 return True
     except Exception:
         pass
     return False
 
 
-def _is_image(file_path):
-    mime = mimetypes.guess_type(file_path)[0] or ""
-    return mime.startswith("image/")
+def _ink_pixels(preview):
+    """Return ``(dark_pixels, total_pixels)`` for a low-resolution page preview."""
+    histogram = preview.convert("L").histogram()
+    return sum(histogram[:128]), sum(histogram)
 
 
-def _pdf_page_count(file_path: str) -> int:
-    """Return the page count of a PDF using pypdf (in-process, no subprocess).
+def _choose_page_dpi(page, dpi):
+    """Return ``(render_dpi, preview)`` for a PyMuPDF page.
 
-    Avoids the ~100-300 ms overhead of spawning pdfinfo_from_path just to
-    count pages.  Falls back to 0 on any error so callers can degrade gracefully.
+    Renders a 72 DPI grayscale preview and measures its ink: with at most
+    _BLANK_INK_PIXELS dark pixels the page is blank and render_dpi is None,
+    below _SPARSE_INK_RATIO it renders at _SPARSE_DPI, otherwise at the
+    requested DPI.  The preview is returned so blank pages need no second render.
     """
-    try:
-        from pypdf import PdfReader
-        return len(PdfReader(file_path).pages)
-    except Exception as exc:
-        logger.warning("Could not read page count via pypdf: %s", exc)
-        return 0
-
-
-def _pdf_to_images_generator(file_path, batch_size=10, dpi=300):
-    """Yield PIL images for each page of a PDF, rendered in small batches.
-
-    Unlike the old list-returning helper, this is a generator so the caller
-    can start processing early pages while later batches are still being
-    rendered — enabling the streaming producer-consumer OCR pipeline.
+    from PIL import Image
+    import fitz
+
+    pix = page.get_pixmap(dpi=_PREVIEW_DPI, colorspace=fitz.csGRAY, alpha=False)
+    preview = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    pix = None
+    dark, total = _ink_pixels(preview)
+    if dark <= _BLANK_INK_PIXELS:
+        return None, preview
+    if dark < _SPARSE_INK_RATIO * total:
+        return min(dpi, _SPARSE_DPI), preview
+    return dpi, preview
+
+
+def _pdf_to_images_generator(
+    file_path, dpi=300, interval=_PDF_REOPEN_INTERVAL, adaptive=False, doc=None, render_cache=None,
+):
+    """Yield PIL images for each page of a PDF, rendered one page at a time.
+
+    Pages are rasterised in-process with PyMuPDF and each pixmap is dropped
+    as soon as it has been copied into a PIL image, so only the page being
+    handed to the consumer is resident.  Every ``interval`` pages the
+    document is closed, MuPDF's object store is shrunk and the document is
+    reopened, which keeps memory flat on very long PDFs.
 
     Args:
         file_path: Path to the PDF file
-        batch_size: Pages to render per convert_from_path call (default: 10)
         dpi: Render resolution (default: 300 — optimal for Tesseract accuracy)
+        interval: Pages between document reopen / store shrink (default: 50)
+        adaptive: Pick a per-page DPI from ink density (see _choose_page_dpi);
+                  blank pages are yielded as their preview, flagged
+                  ``info["blank"]`` so OCR is skipped
+        doc: Already-open PyMuPDF document for file_path; the generator takes
+             ownership and closes it
+        render_cache: Optional callable ``(doc, page) -> (key, cached)`` asked
+                      before each page is rendered; when ``cached`` is not
+                      None the page is not rendered at all
 
     Yields:
-        PIL Image objects, one per page, in document order
+        ``(image, render_key, cached)`` per page, in document order.  image
+        carries its render resolution in ``info["dpi"]`` and is None on a
+        render-cache hit; render_key and cached are None without a cache.
     """
-    from pdf2image import convert_from_path
-
-    total_pages = _pdf_page_count(file_path)
-    if total_pages == 0:
-        # Fallback: convert everything in one call
-        logger.warning("Page count unavailable — rendering entire PDF at once")
-        yield from convert_from_path(file_path, dpi=dpi)
-        return
-
-    logger.info(
-        "PDF has %d pages; rendering in batches of %d at %d DPI",
-        total_pages, batch_size, dpi,
-    )
-    for start_page in range(1, total_pages + 1, batch_size):
-        end_page = min(start_page + batch_size - 1, total_pages)
-        logger.info("Rendering pages %d–%d / %d", start_page, end_page, total_pages)
-        batch = convert_from_path(
-            file_path,
-            first_page=start_page,
-            last_page=end_page,
-            dpi=dpi,
+    import fitz
+    from PIL import Image
+
+    if doc is None:
+        doc = fitz.open(file_path)
+    try:
+        total_pages = doc.page_count
+        logger.info(
+            "PDF has %d pages; rendering at %d DPI%s",
+            total_pages, dpi, " (adaptive)" if adaptive else "",
         )
-        yield from batch
-        gc.collect()
+        for pno in range(total_pages):
+            if pno and pno % interval == 0:
+                page = None
+                doc.close()
+                fitz.TOOLS.store_shrink(100)
+                _release_memory()
+                doc = fitz.open(file_path)
+
+            page = doc[pno]
+            render_key = cached = None
+            if render_cache is not None:
+                render_key, cached = render_cache(doc, page)
+                if cached is not None:
+                    logger.info("Page %d: render cache HIT (skipping render)", pno + 1)
+                    yield None, render_key, cached
+                    continue
+
+            page_dpi = dpi
+            if adaptive:
+                page_dpi, preview = _choose_page_dpi(page, dpi)
+                if page_dpi is None:
+                    logger.info("Page %d is blank; skipping full render", pno + 1)
+                    preview.info["blank"] = True
+                    preview.info["dpi"] = (_PREVIEW_DPI, _PREVIEW_DPI)
+                    yield preview, None, None
+                    continue
+                preview = None
+
+            pix = page.get_pixmap(dpi=page_dpi, alpha=False)
+            image = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+            pix = None
+            image.info["dpi"] = (page_dpi, page_dpi)
+            yield image, render_key, None
+    finally:
+        doc.close()
 
 
 def process_job(job_id, file_path, options, settings, job_store, cancel_event=None, cache=None):
@@ -162,12 +461,15 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
     oem = int(options.get("oem", 1))
     preprocess = options.get("preprocess", "standard")
     
-    logger.info(f"Processing job {job_id}: file={os.path.basename(file_path)}, "
+    filename = os.path.basename(file_path)
+    ext = os.path.splitext(filename)[1].lower()
+
+    logger.info(f"Processing job {job_id}: file={filename}, "
                f"mode={mode}, ocr_engine={ocr_engine}")
 
     result = {
         "job_id": job_id,
-        "filename": os.path.basename(file_path),
+        "filename": filename,
         "tika_text": "",
         "ocr_text": "",
         "final_text": "",
@@ -201,9 +503,11 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
 
             if not file_cache_hit:
                 try:
-                    tika = TikaClient(settings.tika_url)
-                    result["tika_text"] = tika.extract_text(file_path)
-                    result["metadata"] = tika.extract_metadata(file_path)
+                    tika = _shared_tika_client(settings.tika_url)
+                    # One /rmeta/text round-trip returns text and metadata
+                    # together; two concurrent /tika + /meta calls would make
+                    # Tika parse the file twice.
+                    result["tika_text"], result["metadata"] = tika.extract_all(file_path)
                     result["final_text"] = result["tika_text"]
                     logger.info(f"Tika extraction completed. Text length: {len(result['tika_text'])}")
                 except Exception as exc:
@@ -213,9 +517,6 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
 
                 # ── Cache successful extraction ────────────────────────────────
                 if cache is not None and not result["errors"]:
-                    if file_hash is None:
-                        file_hash = hash_file(file_path)
-                        file_opts_hash = hash_options(options, keys=_FILE_OPTS_KEYS)
                     cache.set_file(file_hash, file_opts_hash, {
                         "tika_text": result["tika_text"],
                         "metadata": result["metadata"],
@@ -233,10 +534,15 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
         elif mode in ("ocr", "both"):
             logger.info("OCR mode (%s) for job %s", mode, job_id)
 
+            # One PyMuPDF handle serves scan detection, the page count and
+            # rendering (handed to the producer, which closes it).
+            is_pdf_file = ext == ".pdf"
+            pdf_doc = _open_pdf(file_path) if is_pdf_file else None
+
             # Auto-detect scanned vs. digital PDF to skip expensive deskew
             is_scanned = True
-            if _is_pdf(file_path):
-                is_scanned = not _has_embedded_text(file_path)
+            if pdf_doc is not None:
+                is_scanned = not _has_embedded_text(pdf_doc)
                 logger.info(
                     "PDF scan detection for job %s: %s",
                     job_id, "scanned" if is_scanned else "digital (deskew disabled)",
@@ -245,6 +551,15 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
             job_dpi = int(options.get("dpi", getattr(settings, "ocr_dpi", 300)))
             batch_size = getattr(settings, "ocr_batch_size", 10)
             page_workers = getattr(settings, "ocr_page_workers", 2)
+            adaptive_dpi = getattr(settings, "ocr_adaptive_dpi", False)
+            # CPU-heavy "aggressive" preprocessing runs in the page process pool
+            # (on the thread pool where no forkserver is available)
+            proc_workers = getattr(settings, "ocr_page_proc_workers", 0)
+            use_procs = (
+                preprocess == "aggressive" and proc_workers > 0 and _PROC_POOL_AVAILABLE
+            )
+            if use_procs:
+                page_workers = proc_workers
 
             # Compute a single options hash for all pages in this job
             page_opts_hash = (
@@ -252,9 +567,9 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
                 if cache is not None else None
             )
 
-            # Estimate total pages upfront (pypdf, no subprocess) so progress
-            # percentages are meaningful even before rendering completes.
-            total_pages = _pdf_page_count(file_path) if _is_pdf(file_path) else 1
+            # Know the page count upfront so progress percentages are
+            # meaningful even before rendering completes.
+            total_pages = pdf_doc.page_count if pdf_doc is not None else 1
             if total_pages == 0:
                 total_pages = 1  # safety fallback
 
@@ -263,66 +578,201 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
             # being rendered, overlapping rendering and OCR work.
             render_q: _queue.Queue = _queue.Queue(maxsize=batch_size * 2)
 
+            # Page hashes for the cache are taken here, off the OCR workers,
+            # while the rendered pixels are still hot in CPU cache.
+            def _page_message(img, render_key=None):
+                image_hash = (
+                    hash_image(img)
+                    if cache is not None and not img.info.get("blank") else None
+                )
+                return _RENDER_PAGE, (img, image_hash, render_key)
+
+            # With the cache on, each PDF page's content is hashed before it
+            # is rendered so repeated pages (form headers, separator sheets)
+            # skip rendering as well as OCR.
+            render_opts = f"{job_dpi}:{int(bool(adaptive_dpi))}"
+            stream_digests: dict = {}
+
+            def _render_lookup(doc, page):
+                try:
+                    key = hash_pdf_page(doc, page, render_opts, stream_digests)
+                except Exception as exc:
+                    logger.debug("Could not hash page content: %s", exc)
+                    return None, None
+                cached = cache.get_rendered(key, page_opts_hash)
+                if cached is not None and not cached["detail"].get("tesseract_pdf"):
+                    cached = None
+                return key, cached
+
             def _render_producer():
                 try:
-                    if _is_pdf(file_path):
-                        for img in _pdf_to_images_generator(file_path, batch_size=batch_size, dpi=job_dpi):
-                            render_q.put(img)
-                    elif _is_image(file_path):
-                        render_q.put(open_image(file_path))
+                    if is_pdf_file:
+                        for img, render_key, cached in _pdf_to_images_generator(
+                            file_path, dpi=job_dpi, adaptive=adaptive_dpi, doc=pdf_doc,
+                            render_cache=_render_lookup if cache is not None else None,
+                        ):
+                            if stop_render.is_set() or (
+                                cancel_event is not None and cancel_event.is_set()
+                            ):
+                                break
+                            if cached is not None:
+                                render_q.put((_RENDER_CACHED, cached))
+                            else:
+                                render_q.put(_page_message(img, render_key))
+                    elif ext in _IMAGE_EXTS:
+                        render_q.put(_page_message(open_image(file_path)))
                     else:
-                        render_q.put(RuntimeError("Unsupported file type for OCR."))
+                        render_q.put((_RENDER_ERROR, RuntimeError("Unsupported file type for OCR.")))
                 except Exception as exc:
-                    render_q.put(exc)   # propagate to consumer
+                    render_q.put((_RENDER_ERROR, exc))  # propagate to consumer
                 finally:
-                    render_q.put(None)  # sentinel — rendering done
+                    render_q.put((_RENDER_DONE, None))  # rendering finished
 
+            # Set when the consumer exits early so the producer stops rendering
+            stop_render = _threading.Event()
             render_thread = _threading.Thread(
                 target=_render_producer, daemon=True, name=f"render-{job_id}"
             )
             render_thread.start()
             logger.info(
-                "Streaming OCR started: ~%d page(s), %d worker(s), cache=%s for job %s",
-                total_pages, page_workers, "on" if cache else "off", job_id,
+                "Streaming OCR started: ~%d page(s), %d %s worker(s), cache=%s for job %s",
+                total_pages, page_workers, "process" if use_procs else "thread",
+                "on" if cache else "off", job_id,
             )
 
             # ── Consumer: submit OCR tasks as rendered images arrive ─────────
-            ocr_images: list = []
+            # Images are held only while their page is in flight; once OCR'd,
+            # a page keeps its image only if Tesseract produced no PDF for it
+            # (the PDF already embeds the rendered image).
+            ocr_page_count = 0
+            inflight_images: dict = {}   # idx -> image, while OCR runs
+            fallback_images: dict = {}   # idx -> image, pages without PDF bytes
             ocr_page_pdfs: list = []
             page_results: dict = {}   # idx -> (ocr_text_dict, error_msg)
             completed_count = 0
-            render_error = None
+            # Progress writes are coalesced to one per ~5% or per second
+            last_progress = 0
+            last_progress_ts = time.monotonic()
+            render_errors: list = []
+            render_done = False
+            rss_baseline = _current_rss()
+
+            if use_procs:
+                page_exec = _get_page_proc_executor(settings)
+            elif page_workers > 1:
+                page_exec = _get_page_executor(settings)
+            else:
+                page_exec = _InlineExecutor()
+            futures: dict = {}
+            pending: set = set()
+            # The executor queue is unbounded, so cap pages in flight here;
+            # blocking also back-pressures the renderer via render_q.
+            inflight = _threading.BoundedSemaphore(page_workers * 2)
+
+            def _submit_page(page):
+                nonlocal ocr_page_count, page_exec
+                image, image_hash, render_key = page
+                ocr_page_count += 1
+                idx = ocr_page_count
+                inflight_images[idx] = image
+                args = (
+                    idx, image, image_hash, render_key, ocr_engine, lang,
+                    psm, oem, preprocess, is_scanned, cache, page_opts_hash,
+                )
+                inflight.acquire()
+                try:
+                    if use_procs:
+                        try:
+                            future = _submit_page_proc(page_exec, args)
+                        except _BrokenProcessPool:
+                            logger.warning("OCR page process pool is broken; starting a new one")
+                            _discard_page_proc_executor(page_exec)
+                            page_exec = _get_page_proc_executor(settings)
+                            future = _submit_page_proc(page_exec, args)
+                    else:
+                        future = page_exec.submit(_ocr_page_task, args)
+                except BaseException:
+                    inflight.release()
+                    raise
+                future.add_done_callback(lambda _f: inflight.release())
+                futures[future] = idx
+                pending.add(future)
+
+            def _record_page(future):
+                pending.discard(future)
+                try:
+                    idx, ocr_text, error_msg = future.result()
+                except Exception as exc:
+                    idx = futures[future]
+                    error_msg = f"Page {idx} OCR failed: {exc}"
+                    ocr_text = {"text": "", "engine": ocr_engine, "detail": {"error": str(exc)}}
+                _page_done(idx, ocr_text, error_msg)
+
+            def _record_cached(cached):
+                # Render-cache hit: the page was neither rendered nor OCR'd
+                nonlocal ocr_page_count
+                ocr_page_count += 1
+                _page_done(ocr_page_count, cached, None)
+
+            def _page_done(idx, ocr_text, error_msg):
+                nonlocal completed_count, last_progress, last_progress_ts, rss_baseline
+                page_results[idx] = (ocr_text, error_msg)
+                if error_msg:
+                    result["errors"].append(error_msg)
+
+                image = inflight_images.pop(idx, None)
+                if not (ocr_text.get("detail") or {}).get("tesseract_pdf"):
+                    fallback_images[idx] = image
+                del image
+
+                completed_count += 1
+                progress = int((completed_count / max(total_pages, completed_count)) * 100)
+                now = time.monotonic()
+                if (
+                    progress - last_progress >= 5
+                    or now - last_progress_ts > 1.0
+                    or completed_count == total_pages
+                ):
+                    job_store.update_job(job_id, progress=progress)
+                    last_progress, last_progress_ts = progress, now
+                logger.info(
+                    "OCR page %d/%d done (%d completed)", idx, total_pages, completed_count
+                )
 
-            with _PageExecutor(max_workers=page_workers) as page_exec:
-                futures: dict = {}
-                submitted_idx = 1
+                if completed_count % batch_size == 0:
+                    _release_memory()
+                rss_baseline = _collect_if_grown(rss_baseline)
 
+            def _is_cancelled():
+                return cancel_event is not None and cancel_event.is_set()
+
+            # The producer stops at its first error and always finishes with
+            # _RENDER_DONE, so errors need no separate drain loop.
+            render_handlers = {
+                _RENDER_PAGE: _submit_page,
+                _RENDER_CACHED: _record_cached,
+                _RENDER_ERROR: render_errors.append,
+            }
+
+            try:
                 # Drain the render queue, submitting OCR futures as pages arrive
-                while True:
-                    item = render_q.get()
-                    if item is None:          # sentinel — rendering complete
+                # and recording pages that have already finished along the way
+                while not _is_cancelled():
+                    tag, payload = render_q.get()
+                    if tag == _RENDER_DONE:
+                        render_done = True
                         break
-                    if isinstance(item, Exception):
-                        render_error = item   # handle after the loop
-                        # Drain remaining items so the producer can finish
-                        while render_q.get() is not None:
-                            pass
-                        break
-                    ocr_images.append(item)
-                    args = (
-                        submitted_idx, item, ocr_engine, lang,
-                        psm, oem, preprocess, is_scanned, cache, page_opts_hash,
-                    )
-                    futures[page_exec.submit(_ocr_page_task, args)] = submitted_idx
-                    submitted_idx += 1
-
-                if render_error is not None:
+                    render_handlers[tag](payload)
+                    for future in [f for f in pending if f.done()]:
+                        _record_page(future)
+
+                if render_errors:
+                    render_error = render_errors[0]
                     err_str = str(render_error)
-                    if "poppler" in err_str.lower() or isinstance(render_error, ImportError):
+                    if isinstance(render_error, ImportError):
                         error_msg = (
-                            "PDF rendering failed: Poppler is not installed. "
-                            "Install poppler-utils (Linux/Windows) or "
-                            "`brew install poppler` (macOS). "
+                            "PDF rendering failed: PyMuPDF is not installed. "
+                            "Install it with `pip install PyMuPDF`. "
                             f"({err_str})"
                         )
                     else:
@@ -331,40 +781,30 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
                     result["errors"].append(error_msg)
 
                 # Now exact page count is known
-                total_pages = len(ocr_images) or total_pages
-
-                for future in _as_completed(futures):
-                    if cancel_event and cancel_event.is_set():
-                        logger.info("Job %s cancelled during parallel OCR", job_id)
-                        for f in futures:
-                            f.cancel()
-                        return
-
-                    try:
-                        idx, ocr_text, error_msg = future.result()
-                    except Exception as exc:
-                        idx = futures[future]
-                        error_msg = f"Page {idx} OCR failed: {exc}"
-                        ocr_text = {"text": "", "engine": ocr_engine, "detail": {"error": str(exc)}}
-
-                    page_results[idx] = (ocr_text, error_msg)
-                    if error_msg:
-                        result["errors"].append(error_msg)
-
-                    completed_count += 1
-                    progress = int((completed_count / total_pages) * 100) if total_pages else 0
-                    job_store.update_job(job_id, progress=progress)
-                    logger.info(
-                        "OCR page %d/%d done (%d completed)", idx, total_pages, completed_count
-                    )
+                total_pages = ocr_page_count or total_pages
 
-                    if total_pages > 50 and completed_count % 10 == 0:
-                        gc.collect()
-                        logger.info("Memory cleanup after %d completed pages", completed_count)
+                for future in _as_completed(list(pending)):
+                    if _is_cancelled():
+                        break
+                    _record_page(future)
+
+                if _is_cancelled():
+                    logger.info("Job %s cancelled during parallel OCR", job_id)
+                    for f in futures:
+                        f.cancel()
+                    return
+            finally:
+                # On any exit (cancel, OCR or cache error) stop the producer
+                # and empty the queue so a blocked put can return and it can
+                # finish, closing the document and dropping its pages.
+                stop_render.set()
+                while not render_done:
+                    render_done = render_q.get()[0] == _RENDER_DONE
 
             render_thread.join(timeout=5)  # ensure producer has exited cleanly
 
             # Reassemble pages in document order
+            ocr_images: list = []
             for idx in range(1, total_pages + 1):
                 if idx not in page_results:
                     continue
@@ -380,15 +820,23 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
                     "detail": safe_detail,
                 })
                 ocr_page_pdfs.append(page_pdf_bytes)
-
-            result["ocr_text"] = "\n\n".join(page["text"] for page in result["pages"])
-            logger.info("OCR completed. Total text length: %d", len(result["ocr_text"]))
+                ocr_images.append(fallback_images.pop(idx, None))
+
+            # The document text is never joined into one string: pages are
+            # streamed into the .txt file and the JSON keeps ocr_text and
+            # final_text blank (per-page text stays in "pages"; the result
+            # endpoint and the JSON download fill both back in).
+            result["ocr_text"] = result["final_text"] = ""
+            text_pages = [page["text"] for page in result["pages"]]
+            logger.info(
+                "OCR completed. Total text length: %d",
+                sum(map(len, text_pages)) + 2 * max(len(text_pages) - 1, 0),
+            )
 
             if mode == "both":
-                result["final_text"] = result["ocr_text"]
                 logger.info("Text extraction enabled (mode=both)")
             else:
-                result["final_text"] = ""
+                text_pages = None
                 logger.info("Text extraction disabled (mode=ocr)")
             
             # Save results with PDF generation
@@ -397,9 +845,13 @@ def process_job(job_id, file_path, options, settings, job_store, cancel_event=No
                 settings.result_dir,
                 job_id,
                 ocr_images,
-                ocr_page_pdfs if ocr_images else None,
+                ocr_page_pdfs,
                 generate_pdf=True,
+                text_pages=text_pages,
             )
+            ocr_images.clear()
+            _collect_if_grown(rss_baseline)
+            _release_memory()
         
         else:
             result["errors"].append(f"Invalid mode: {mode}")
@@ -455,11 +907,17 @@ def _run_ocr_engine(image, engine, result, lang="eng", psm=6, oem=1, preprocess=
             raise ValueError(f"Unsupported OCR engine: {engine}")
         ocr_result = run_tesseract(image, lang=lang, psm=psm, oem=oem, preprocess=preprocess, deskew=deskew)
         
-        result_dict = ocr_result.__dict__
-        logger.info(f"OCR completed. Engine: {engine}, Text length: {len(result_dict['text'])}, "
-                   f"Detail: {result_dict.get('detail', {})}")
+        # Copy out the fields rather than aliasing ocr_result.__dict__, and log
+        # a summary: the detail dict carries the page's Tesseract PDF bytes.
+        text, detail = ocr_result.text, ocr_result.detail or {}
+        del ocr_result
+        pdf_bytes = detail.get("tesseract_pdf")
+        logger.info(
+            "OCR completed. Engine: %s, Text length: %d, Confidence: %s, PDF bytes: %d",
+            engine, len(text), detail.get("confidence"), len(pdf_bytes) if pdf_bytes else 0,
+        )
         
-        return result_dict
+        return {"text": text, "engine": engine, "detail": detail}
     except Exception as exc:
         error_msg = f"OCR failed ({engine}): {exc}"
         logger.error(error_msg, exc_info=True)
@@ -467,66 +925,102 @@ def _run_ocr_engine(image, engine, result, lang="eng", psm=6, oem=1, preprocess=
         return {"text": "", "engine": engine, "detail": {"error": str(exc)}}
 
 
-def _persist_result(result, result_dir, job_id, ocr_images, ocr_page_pdfs=None, generate_pdf=True):
+def _write_result_json(json_path, result):
+    """Write the result dict as JSON, streaming the ``pages`` list.
+
+    The skeleton (everything except pages) is dumped in one go; pages are
+    then serialized and written one at a time so a document with thousands
+    of pages never builds a single multi-megabyte string.  ``pages`` ends up
+    as the last key of the object.  The file is replaced atomically.
+    """
+    pages = result.get("pages") or []
+    skeleton = json_dumps(
+        {key: value for key, value in result.items() if key != "pages"},
+        indent=True,
+    )
+    with atomic_open(json_path) as handle:
+        handle.write(skeleton[:-2])  # drop the closing "\n}"
+        handle.write(b',\n  "pages": [')
+        for index, page in enumerate(pages):
+            handle.write(b"\n    " if index == 0 else b",\n    ")
+            handle.write(json_dumps(page))
+        handle.write(b"\n  ]\n}" if pages else b"]\n}")
+
+
+def _persist_result(
+    result, result_dir, job_id, ocr_images, ocr_page_pdfs=None, generate_pdf=True, text_pages=None,
+):
     """Save job results to disk.
     
     Args:
         result: Result dictionary with extracted text and metadata
         result_dir: Directory to save results
         job_id: Job identifier
-        ocr_images: List of PIL images (for PDF generation with images)
+        ocr_images: Per-page PIL images, None for pages that have PDF bytes
         ocr_page_pdfs: Optional list of per-page PDF bytes (for Tesseract output)
         generate_pdf: Whether to generate a PDF file (False for text-only mode)
+        text_pages: Optional per-page texts written to the .txt file, joined
+                    by blank lines, in place of ``result["final_text"]``
     
     Returns:
         Tuple of (json_path, text_path, pdf_path)
     """
     json_path, text_path, pdf_path = result_paths(result_dir, job_id)
-    
-    # Save JSON result
-    with open(json_path, "w", encoding="utf-8") as handle:
-        import json
-        json.dump(result, handle, indent=2)
-    
-    # Save plain text
-    with open(text_path, "w", encoding="utf-8") as handle:
-        handle.write(result.get("final_text", ""))
-    
-    # Generate PDF output (only for OCR modes)
+
+    _write_result_json(json_path, result)
+    _write_result_text(text_path, result, text_pages)
+
     if generate_pdf:
-        try:
-            if ocr_images and len(ocr_images) > 0:
-                # Create PDF with images and text overlay (OCR modes only)
-                page_texts = [page.get("text", "") for page in result.get("pages", [])]
-                logger.info(f"Creating OCR PDF with {len(ocr_images)} images and {len(page_texts)} page texts")
-                write_ocr_pdf_from_images(
-                    pdf_path,
-                    result.get("filename", "OCR Output"),
-                    ocr_images,
-                    page_texts,
-                    ocr_page_pdfs,
-                )
-            else:
-                # No images available - skip PDF generation
-                logger.warning(f"No images available for PDF generation (mode might be text-only)")
-                pdf_path = None
-            
-            # Verify PDF was created and has content
-            import os
-            if pdf_path and os.path.exists(pdf_path):
-                pdf_size = os.path.getsize(pdf_path)
-                logger.info(f"PDF created successfully: {pdf_path} ({pdf_size} bytes)")
-                if pdf_size < 500:
-                    logger.warning(f"PDF file is suspiciously small: {pdf_size} bytes")
-            elif pdf_path:
-                logger.error(f"PDF file was not created: {pdf_path}")
-                
-        except Exception as exc:
-            logger.error(f"Failed to create PDF: {exc}", exc_info=True)
-            pdf_path = None
+        pdf_path = _write_result_pdf(pdf_path, result, ocr_images, ocr_page_pdfs)
     else:
         # Text-only mode - no PDF generation
         logger.info(f"PDF generation skipped (text-only mode)")
         pdf_path = None
-    
+
     return json_path, text_path, pdf_path
+
+
+def _write_result_text(text_path, result, text_pages=None):
+    with open(text_path, "w", encoding="utf-8") as handle:
+        if text_pages is None:
+            handle.write(result.get("final_text", ""))
+            return
+        for index, text in enumerate(text_pages):
+            if index:
+                handle.write("\n\n")
+            handle.write(text)
+
+
+def _write_result_pdf(pdf_path, result, ocr_images, ocr_page_pdfs):
+    """Generate the OCR PDF; returns its path, or None if none was written."""
+    try:
+        if ocr_page_pdfs or any(image is not None for image in ocr_images):
+            # Create PDF from Tesseract pages, overlaying text on images
+            # only where a page has no PDF bytes (OCR modes only)
+            page_texts = [page.get("text", "") for page in result.get("pages", [])]
+            logger.info(f"Creating OCR PDF with {len(page_texts)} page(s)")
+            write_ocr_pdf_from_images(
+                pdf_path,
+                result.get("filename", "OCR Output"),
+                ocr_images,
+                page_texts,
+                ocr_page_pdfs,
+            )
+        else:
+            # No pages available - skip PDF generation
+            logger.warning(f"No pages available for PDF generation (mode might be text-only)")
+            pdf_path = None
+
+        # Verify PDF was created and has content
+        if pdf_path and os.path.exists(pdf_path):
+            pdf_size = os.path.getsize(pdf_path)
+            logger.info(f"PDF created successfully: {pdf_path} ({pdf_size} bytes)")
+            if pdf_size < 500:
+                logger.warning(f"PDF file is suspiciously small: {pdf_size} bytes")
+        elif pdf_path:
+            logger.error(f"PDF file was not created: {pdf_path}")
+
+    except Exception as exc:
+        logger.error(f"Failed to create PDF: {exc}", exc_info=True)
+        pdf_path = None
+    return pdf_path
@@ -1,5 +1,12 @@
+import contextlib
 import os
 
+try:
+    import orjson
+except ImportError:  # stdlib fallback; orjson is listed in requirements.txt
+    orjson = None
+    import json as _json
+
 
 def ensure_dirs(*paths):
     for path in paths:
@@ -31,3 +38,58 @@ def audio_result_path(result_dir, job_id, output_format):
 def video_result_path(result_dir, job_id, output_format):
     """Generate path for converted video output."""
     return os.path.join(result_dir, f"{job_id}_video.{output_format}")
+
+
+def ffmpeg_log_path(result_dir, job_id):
+    """Generate path for the FFmpeg log of a video conversion."""
+    return os.path.join(result_dir, f"{job_id}.ffmpeg.log")
+
+
+def _json_default(value):
+    # numpy scalars/arrays from PaddleOCR details (orjson handles these natively)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def json_dumps(obj, indent=False):
+    """Serialize ``obj`` to UTF-8 JSON bytes, with orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return _json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=(",", ": ") if indent else (",", ":"),
+        ensure_ascii=False,
+        default=_json_default,
+    ).encode("utf-8")
+
+
+@contextlib.contextmanager
+def atomic_open(path):
+    """Open a binary file that replaces ``path`` only once fully written.
+
+    Data goes to ``path + ".tmp"``, which is fsync'ed and renamed over
+    ``path`` when the block exits cleanly, so a killed worker never leaves a
+    truncated result; on error the temp file is removed.
+    """
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json_atomic(path, obj):
+    """Write ``obj`` to ``path`` as indented JSON, atomically."""
+    with atomic_open(path) as handle:
+        handle.write(json_dumps(obj, indent=True))
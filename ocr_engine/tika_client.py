@@ -1,29 +1,163 @@
+import functools
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_UPLOAD_CHUNK_SIZE = 1 << 20
+_DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Retry policy shared by the requests session and the sendfile path
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.2
+_RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+class _FileChunks:
+    """Re-iterable chunk reader over an open binary file.
+
+    requests sends an iterable body with chunked transfer encoding, reading
+    1 MiB at a time instead of http.client's 8 KiB blocks.  Each iteration
+    restarts from the beginning of the file, so a retried request resends
+    the whole body rather than an exhausted generator.
+    """
+
+    def __init__(self, file_handle, chunk_size=_UPLOAD_CHUNK_SIZE):
+        self._file = file_handle
+        self._chunk_size = chunk_size
+
+    def __iter__(self):
+        self._file.seek(0)
+        while chunk := self._file.read(self._chunk_size):
+            yield chunk
 
 
 class TikaClient:
     def __init__(self, base_url, timeout=60):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # Keep-alive connections to Tika are pooled and reused across calls;
+        # gateway errors from a restarting Tika are retried with backoff.
+        self.session = requests.Session()
+        retry = Retry(
+            total=_RETRY_TOTAL,
+            backoff_factor=_RETRY_BACKOFF,
+            status_forcelist=sorted(_RETRY_STATUSES),
+            allowed_methods=frozenset({"PUT"}),
+            raise_on_status=False,
+        )
+        self.session.mount(
+            self.base_url,
+            HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry),
+        )
 
-    def extract_text(self, file_path):
+        # On Linux, plain-HTTP uploads go out with socket.sendfile() so file
+        # bytes move from the page cache to the socket without passing
+        # through Python.  Each thread keeps its own keep-alive connection.
+        url = urlsplit(self.base_url)
+        self._sendfile = (
+            sys.platform.startswith("linux")
+            and url.scheme == "http"
+            and not requests.utils.get_environ_proxies(self.base_url)
+        )
+        self._host, self._port = url.hostname, url.port or 80
+        self._path_prefix = url.path.rstrip("/")
+        self._local = threading.local()
+
+    def close(self):
+        self.session.close()
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _put(self, path, file_path, accept):
+        """PUT a file to ``path`` and return the response body as bytes.
+
+        Raises requests.HTTPError for error statuses, like raise_for_status().
+        """
+        if self._sendfile:
+            return self._put_sendfile(path, file_path, accept)
         with open(file_path, "rb") as file_handle:
-            response = requests.put(
-                f"{self.base_url}/tika",
-                data=file_handle,
-                headers={"Accept": "text/plain"},
+            response = self.session.put(
+                f"{self.base_url}{path}",
+                data=_FileChunks(file_handle),
+                headers={"Accept": accept},
                 timeout=self.timeout,
+                stream=True,
             )
-        response.raise_for_status()
-        return response.text.strip()
+        with response:
+            response.raise_for_status()
+            return b"".join(response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE))
 
-    def extract_metadata(self, file_path):
+    def _put_sendfile(self, path, file_path, accept):
+        url = f"{self.base_url}{path}"
         with open(file_path, "rb") as file_handle:
-            response = requests.put(
-                f"{self.base_url}/meta",
-                data=file_handle,
-                headers={"Accept": "application/json"},
-                timeout=self.timeout,
-            )
-        response.raise_for_status()
-        return response.json()
+            size = os.fstat(file_handle.fileno()).st_size
+            for attempt in range(_RETRY_TOTAL + 1):
+                if attempt:
+                    time.sleep(_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                conn = getattr(self._local, "conn", None)
+                if conn is None:
+                    conn = self._local.conn = http.client.HTTPConnection(
+                        self._host, self._port, timeout=self.timeout
+                    )
+                try:
+                    conn.putrequest("PUT", self._path_prefix + path, skip_accept_encoding=True)
+                    conn.putheader("Content-Length", str(size))
+                    conn.putheader("Accept", accept)
+                    conn.endheaders()
+                    file_handle.seek(0)
+                    conn.sock.sendfile(file_handle)
+                    response = conn.getresponse()
+                    body = response.read()
+                except (OSError, http.client.HTTPException) as exc:
+                    # Stale keep-alive socket or Tika restarting: reconnect
+                    conn.close()
+                    if attempt == _RETRY_TOTAL:
+                        raise requests.ConnectionError(f"{exc} for url: {url}") from exc
+                    continue
+                if response.status in _RETRY_STATUSES and attempt < _RETRY_TOTAL:
+                    continue
+                if response.status >= 400:
+                    raise requests.HTTPError(
+                        f"{response.status} {response.reason} for url: {url}"
+                    )
+                return body
+
+    def extract_text(self, file_path):
+        body = self._put("/tika", file_path, "text/plain")
+        return body.decode("utf-8", errors="replace").strip()
+
+    def extract_metadata(self, file_path):
+        return json.loads(self._put("/meta", file_path, "application/json"))
+
+    def extract_all(self, file_path):
+        """Return ``(text, metadata)`` from a single ``/rmeta/text`` request.
+
+        Tika parses the file once and returns one JSON object per document
+        (the container first, then any embedded files), each carrying its
+        metadata plus the extracted text under ``X-TIKA:content``.
+        """
+        documents = json.loads(self._put("/rmeta/text", file_path, "application/json")) or [{}]
+        contents = ((doc.get("X-TIKA:content") or "").strip() for doc in documents)
+        text = "\n\n".join(content for content in contents if content)
+        metadata = dict(documents[0])
+        metadata.pop("X-TIKA:content", None)
+        return text, metadata
+
+
+@functools.lru_cache(maxsize=None)
+def shared_client(base_url):
+    """Return the process-wide TikaClient for ``base_url``.
+
+    Jobs share one client so its pooled connections survive between files.
+    """
+    return TikaClient(base_url)
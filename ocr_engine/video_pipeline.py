@@ -1,21 +1,57 @@
 """Video conversion pipeline using FFmpeg."""
 
+import functools
 import json
 import logging
 import os
+import shutil
 import subprocess
+import tempfile
+import threading
+import time
 from dataclasses import dataclass
+from typing import Optional
 
-from .storage import video_result_path
+try:
+    import av  # PyAV: probes in-process through libavformat
+except ImportError:  # optional; ffprobe is used instead
+    av = None
+
+from .storage import ffmpeg_log_path, video_result_path, write_json_atomic
 
 logger = logging.getLogger(__name__)
 
+# Minimum interval between job-store progress writes while FFmpeg runs
+_PROGRESS_INTERVAL = 0.5
+
+# Bytes of the FFmpeg log quoted in a failed job's error
+_LOG_TAIL_BYTES = 4096
+
+# Encode time limit: this many seconds per second of input, never below the
+# floor; inputs of unknown duration get the configured maximum
+_TIMEOUT_PER_SECOND = 8
+_MIN_TIMEOUT = 60
+# Grace period between SIGTERM and SIGKILL for a timed-out FFmpeg
+_TERMINATE_GRACE = 5
+
+# RAM-backed directory used to stage small inputs and outputs, and the room
+# reserved there for an output, as a multiple of the input size (GIF and
+# MPEG-4 outputs can outgrow an H.264 input; a staged encode that runs out of
+# space is redone in place)
+_TMPFS_DIR = "/dev/shm"
+_TMPFS_OUTPUT_FACTOR = 4
+# Bytes reserved on tmpfs by jobs currently staging there
+_tmpfs_reserved = 0
+_tmpfs_lock = threading.Lock()
+
 
 @dataclass
 class VideoConversionOptions:
     """Options for video conversion."""
     output_format: str = "mp4"
     quality: str = "medium"  # low, medium, high
+    hwaccel: Optional[str] = None  # nvenc, qsv, vaapi; None = software
+    force_reencode: bool = False  # re-encode even when the video could be copied
 
 
 # Output format mapping (user-friendly name to FFmpeg settings)
@@ -30,37 +66,415 @@ OUTPUT_FORMAT_MAP = {
     "flv": {"ext": "flv", "vcodec": "flv1", "acodec": "mp3"},
 }
 
-# Quality presets (CRF values for x264, lower = better quality)
+# Quality presets (CRF values for x264, lower = better quality; NVENC uses
+# its p1-p7 presets and the hardware encoders a constant-quality target on a
+# similar scale; VP9's CRF runs 0-63, so it has its own values)
 QUALITY_PRESETS = {
-    "low": {"crf": "28", "preset": "faster"},
-    "medium": {"crf": "23", "preset": "medium"},
-    "high": {"crf": "18", "preset": "slow"},
+    "low": {"crf": "28", "preset": "faster", "nvenc_preset": "p1", "cq": "28", "vp9_crf": "36"},
+    "medium": {"crf": "23", "preset": "medium", "nvenc_preset": "p4", "cq": "23", "vp9_crf": "31"},
+    "high": {"crf": "18", "preset": "slow", "nvenc_preset": "p7", "cq": "19", "vp9_crf": "24"},
+}
+
+
+def validate_options(options):
+    """Parse video conversion options, raising ValueError if unsupported.
+
+    Called when the job is submitted so bad requests are rejected before
+    an upload is queued, and again by the worker to rebuild the options.
+    """
+    conv_options = VideoConversionOptions(
+        output_format=options.get("output_format", "mp4"),
+        quality=options.get("quality", "medium"),
+        force_reencode=options.get("force_reencode") in (True, "true"),
+    )
+    if conv_options.output_format not in OUTPUT_FORMAT_MAP:
+        raise ValueError(f"Unsupported output format: {conv_options.output_format}")
+    if conv_options.quality not in QUALITY_PRESETS:
+        raise ValueError(f"Unsupported quality: {conv_options.quality}")
+    return conv_options
+
+
+VAAPI_DEVICE = "/dev/dri/renderD128"
+
+# Hardware H.264 backends that can replace libx264, in the order "auto" tries
+# them.  "device" sets up the hardware context (also used by the probe),
+# "decode" keeps decoded frames on the device, and "upload" is the filter that
+# moves frames to it ahead of the encoder.
+HW_H264_BACKENDS = {
+    "nvenc": {
+        "vcodec": "h264_nvenc",
+        "device": [],
+        "decode": ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"],
+        "upload": None,
+        "probe_upload": None,
+    },
+    "qsv": {
+        "vcodec": "h264_qsv",
+        "device": ["-init_hw_device", "qsv=hw", "-filter_hw_device", "hw"],
+        "decode": ["-hwaccel", "qsv", "-hwaccel_output_format", "qsv"],
+        "upload": "format=qsv,hwupload=extra_hw_frames=64",
+        "probe_upload": "format=nv12,hwupload=extra_hw_frames=64",
+    },
+    "vaapi": {
+        "vcodec": "h264_vaapi",
+        "device": ["-vaapi_device", VAAPI_DEVICE],
+        "decode": [],
+        "upload": "format=nv12,hwupload",
+        "probe_upload": "format=nv12,hwupload",
+    },
 }
 
 
-def get_video_info(file_path):
-    """Get video duration and metadata using ffprobe."""
+@functools.lru_cache(maxsize=None)
+def _hwaccel_available(name):
+    """Return True if FFmpeg can actually encode with backend ``name`` here.
+
+    ``ffmpeg -encoders`` lists NVENC, QSV and VAAPI whenever FFmpeg was built
+    with them, hardware or not, so a one-frame test encode is used instead.
+    The answer is cached for the life of the process.
+    """
+    backend = HW_H264_BACKENDS[name]
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", *backend["device"],
+           "-f", "lavfi", "-i", "color=c=black:s=256x256:d=0.04"]
+    if backend["probe_upload"]:
+        cmd.extend(["-vf", backend["probe_upload"]])
+    cmd.extend(["-frames:v", "1", "-c:v", backend["vcodec"], "-f", "null", "-"])
     try:
-        result = subprocess.run(
-            [
-                "ffprobe", "-v", "quiet", "-print_format", "json",
-                "-show_format", "-show_streams", file_path
-            ],
-            capture_output=True,
-            text=True,
-            timeout=30
+        result = subprocess.run(cmd, capture_output=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    if result.returncode == 0:
+        logger.info(f"Hardware video encoder available: {backend['vcodec']}")
+    return result.returncode == 0
+
+
+@functools.lru_cache(maxsize=None)
+def _detect_hwaccel():
+    """Return the first working hardware backend on this host, or None."""
+    for name in HW_H264_BACKENDS:
+        if _hwaccel_available(name):
+            return name
+    return None
+
+
+def _select_hwaccel(settings, format_settings):
+    """Return the hardware encoder backend for this output, or None for software."""
+    if format_settings["vcodec"] != "libx264":
+        return None
+    mode = getattr(settings, "video_hwaccel", "auto")
+    if mode == "auto":
+        return _detect_hwaccel()
+    if mode in HW_H264_BACKENDS and _hwaccel_available(mode):
+        return mode
+    return None
+
+
+def _output_args(format_settings, quality_settings, hwaccel=None, copy_video=False):
+    """Return the codec, quality and muxer arguments that follow the input."""
+    args = []
+    backend = HW_H264_BACKENDS[hwaccel] if hwaccel else None
+
+    # Add video codec settings
+    if format_settings["vcodec"] == "gif":
+        # Special handling for GIF - build a palette from the clip itself and
+        # map frames onto it in the same pass (smaller, cleaner than the
+        # default 256-colour palette)
+        args.extend([
+            "-filter_complex",
+            "[0:v] fps=10,scale=480:-1:flags=lanczos,split [a][b];"
+            "[a] palettegen=max_colors=128 [p];"
+            "[b][p] paletteuse=dither=bayer:bayer_scale=5",
+            "-loop", "0"
+        ])
+    elif copy_video:
+        args.extend(["-c:v", "copy"])
+    elif backend:
+        if backend["upload"]:
+            args.extend(["-vf", backend["upload"]])
+        args.extend(["-c:v", backend["vcodec"]])
+        if hwaccel == "nvenc":
+            args.extend([
+                "-preset", quality_settings["nvenc_preset"],
+                "-tune", "hq",
+                "-rc", "vbr",
+                "-cq", quality_settings["cq"],
+                "-b:v", "0",
+            ])
+        elif hwaccel == "qsv":
+            args.extend([
+                "-preset", quality_settings["preset"],
+                "-global_quality", quality_settings["cq"],
+            ])
+        else:
+            args.extend(["-qp", quality_settings["cq"]])
+    else:
+        args.extend(["-c:v", format_settings["vcodec"]])
+
+        # Add quality settings for supported codecs
+        if format_settings["vcodec"] in ("libx264", "libx265"):
+            args.extend([
+                "-crf", quality_settings["crf"],
+                "-preset", quality_settings["preset"]
+            ])
+        elif format_settings["vcodec"] == "libvpx-vp9":
+            # Constant quality on VP9's own scale; row-mt and tile columns
+            # let libvpx use more than one thread per frame
+            args.extend([
+                "-crf", quality_settings["vp9_crf"], "-b:v", "0",
+                "-row-mt", "1", "-tile-columns", "2",
+            ])
+
+    # Add audio codec if applicable
+    if format_settings["acodec"]:
+        args.extend(["-c:a", format_settings["acodec"]])
+        if format_settings["acodec"] in ("aac", "libopus"):
+            args.extend(["-b:a", "192k"])
+    elif format_settings["vcodec"] == "gif":
+        args.extend(["-an"])  # No audio for GIF
+
+    if format_settings["ext"] in ("mp4", "mov"):
+        # Put the moov index up front so players can start before the download ends
+        args.extend(["-movflags", "+faststart"])
+
+    return tuple(args)
+
+
+def _build_argv_templates():
+    """Precompute output arguments for every (format, quality, encoder).
+
+    The encoder is None for software, a HW_H264_BACKENDS name, or "copy";
+    the hardware and copy variants exist only for H.264 outputs.
+    """
+    templates = {}
+    for output_format, format_settings in OUTPUT_FORMAT_MAP.items():
+        encoders = [None]
+        if format_settings["vcodec"] == "libx264":
+            encoders.extend([*HW_H264_BACKENDS, "copy"])
+        for quality, quality_settings in QUALITY_PRESETS.items():
+            for encoder in encoders:
+                templates[(output_format, quality, encoder)] = _output_args(
+                    format_settings, quality_settings,
+                    hwaccel=None if encoder == "copy" else encoder,
+                    copy_video=encoder == "copy",
+                )
+    return templates
+
+
+_ARGV_TEMPLATES = _build_argv_templates()
+
+
+def _build_ffmpeg_cmd(file_path, output_path, output_format, quality, hwaccel=None, threads=0,
+                      copy_video=False):
+    """Build the FFmpeg argv for one conversion (software when hwaccel is None).
+
+    ``threads`` caps encoder threads so concurrent jobs share the CPUs
+    instead of each one claiming all of them (0 = FFmpeg's default).
+    ``copy_video`` remuxes the video stream as-is instead of encoding it.
+    """
+    # Machine-readable progress on stdout instead of the stderr status line
+    cmd = ["ffmpeg", "-y", "-progress", "pipe:1", "-nostats"]
+    if threads and OUTPUT_FORMAT_MAP[output_format]["vcodec"] == "gif":
+        # The GIF palette graph is the expensive part and runs on one thread
+        # unless filter threading is requested explicitly
+        cmd.extend(["-filter_complex_threads", str(threads)])
+    if hwaccel and not copy_video:
+        # Decode on the GPU as well where possible and keep frames in device memory
+        backend = HW_H264_BACKENDS[hwaccel]
+        cmd.extend(backend["device"] + backend["decode"])
+    cmd.extend(["-i", file_path])
+    if threads:
+        cmd.extend(["-threads", str(threads)])
+    cmd.extend(_ARGV_TEMPLATES[(output_format, quality, "copy" if copy_video else hwaccel)])
+    cmd.append(output_path)
+    return cmd
+
+
+def _tail_log(log_path, size=_LOG_TAIL_BYTES):
+    """Return the last ``size`` bytes of ``log_path`` as text."""
+    try:
+        with open(log_path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - size))
+            return f.read().decode("utf-8", errors="replace")
+    except OSError:
+        return ""
+
+
+def _reserve_tmpfs(input_size, settings):
+    """Reserve tmpfs space for staging a job; returns the bytes reserved or 0.
+
+    Staging applies to inputs up to VIDEO_TMPFS_MAX_MB.  The reservation
+    covers the input plus _TMPFS_OUTPUT_FACTOR times its size for the output
+    and must fit in the free space left after other jobs' reservations.
+    Release it with _release_tmpfs() once the staged files are gone.
+    """
+    max_bytes = getattr(settings, "video_tmpfs_max_mb", 0) * 1024 * 1024
+    if not max_bytes or input_size > max_bytes:
+        return 0
+    needed = input_size * (1 + _TMPFS_OUTPUT_FACTOR)
+    global _tmpfs_reserved
+    with _tmpfs_lock:
+        try:
+            st = os.statvfs(_TMPFS_DIR)
+        except OSError:
+            return 0
+        # Other jobs' reservations are subtracted in full, even the part
+        # they have already written, to stay on the safe side
+        if st.f_bavail * st.f_frsize - _tmpfs_reserved < needed:
+            return 0
+        _tmpfs_reserved += needed
+    return needed
+
+
+def _release_tmpfs(reserved):
+    global _tmpfs_reserved
+    with _tmpfs_lock:
+        _tmpfs_reserved -= reserved
+
+
+def _stage_input(file_path, output_ext):
+    """Copy ``file_path`` to tmpfs; returns (staged_input, staged_output).
+
+    Both files are created with mkstemp (mode 0600, unguessable names):
+    inputs may be decrypted uploads and must not become world-readable.
+    """
+    input_ext = os.path.splitext(file_path)[1]
+    fd, staged_input = tempfile.mkstemp(suffix=input_ext, dir=_TMPFS_DIR)
+    try:
+        with os.fdopen(fd, "wb") as dst, open(file_path, "rb") as src:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        fd, staged_output = tempfile.mkstemp(suffix=f".{output_ext}", dir=_TMPFS_DIR)
+        os.close(fd)
+    except BaseException:
+        os.remove(staged_input)
+        raise
+    return staged_input, staged_output
+
+
+def _encode_timeout(duration, max_timeout):
+    """Return the FFmpeg time limit in seconds for an input of ``duration``."""
+    if duration <= 0:
+        return max_timeout
+    return max(_MIN_TIMEOUT, min(max_timeout, _TIMEOUT_PER_SECOND * duration))
+
+
+def _run_ffmpeg(cmd, log_path, duration=0, on_progress=None, timeout=600):
+    """Run FFmpeg to completion and return its exit status.
+
+    stderr is written straight to ``log_path`` by FFmpeg, never buffered in
+    this process.  ``on_progress`` is called with the fraction of
+    ``duration`` encoded so far, parsed from the ``-progress pipe:1``
+    key=value lines on stdout.  Raises subprocess.TimeoutExpired if FFmpeg
+    runs longer than ``timeout``.
+    """
+    logger.info(f"Converting video: {' '.join(cmd)}")
+    with open(log_path, "wb") as log_file:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=log_file,
         )
-        if result.returncode == 0:
-            data = json.loads(result.stdout)
-            duration = float(data.get("format", {}).get("duration", 0))
-            streams = data.get("streams", [])
-            video_stream = next((s for s in streams if s.get("codec_type") == "video"), {})
-            return {
-                "duration": duration,
-                "width": video_stream.get("width"),
-                "height": video_stream.get("height"),
-                "codec": video_stream.get("codec_name"),
-            }
+
+        timed_out = threading.Event()
+
+        def _kill():
+            # SIGTERM lets FFmpeg shut down its own threads and children;
+            # SIGKILL only if it ignores that
+            timed_out.set()
+            process.terminate()
+            try:
+                process.wait(_TERMINATE_GRACE)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        watchdog = threading.Timer(timeout, _kill)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            for line in process.stdout:
+                key, _, value = line.strip().partition(b"=")
+                # out_time_ms is in microseconds despite its name
+                if key == b"out_time_ms" and value.isdigit() and duration > 0 and on_progress:
+                    on_progress(min(int(value) / (duration * 1e6), 1.0))
+            process.wait()
+        finally:
+            watchdog.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        return process.returncode
+
+
+def _probe_pyav(file_path):
+    """Read the same fields as the ffprobe query with PyAV, without a subprocess."""
+    with av.open(file_path) as container:
+        video_stream = container.streams.video[0] if container.streams.video else None
+        duration = container.duration / av.time_base if container.duration else 0.0
+        if video_stream is None:
+            return {"duration": duration, "width": None, "height": None, "codec": None}
+        codec_context = video_stream.codec_context
+        return {
+            "duration": duration,
+            "width": codec_context.width,
+            "height": codec_context.height,
+            "codec": codec_context.name,
+        }
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_video_info_cached(file_path, size, mtime_ns):
+    """Probe ``file_path`` with PyAV, or ffprobe when PyAV is unavailable.
+
+    Cached by file identity: the key is (path, size, mtime_ns), so a
+    rewritten file is probed again.  Failures raise, which lru_cache does
+    not cache.
+    """
+    if av is not None:
+        try:
+            return _probe_pyav(file_path)
+        except Exception as e:
+            logger.debug(f"PyAV could not probe {file_path}, using ffprobe: {e}")
+
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "quiet", "-print_format", "json",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,codec_name:format=duration",
+            file_path
+        ],
+        capture_output=True,
+        text=True,
+        timeout=30
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe exited with status {result.returncode}")
+    data = json.loads(result.stdout)
+    duration = float(data.get("format", {}).get("duration", 0))
+    # Only the first video stream is selected, if there is one
+    video_stream = (data.get("streams") or [{}])[0]
+    return {
+        "duration": duration,
+        "width": video_stream.get("width"),
+        "height": video_stream.get("height"),
+        "codec": video_stream.get("codec_name"),
+    }
+
+
+def get_video_info(file_path, stat_result=None):
+    """Get video duration, dimensions and codec.
+
+    Probes in-process with PyAV when installed, otherwise with ffprobe;
+    results are cached per (path, size, mtime).  Pass ``stat_result`` when
+    the caller has already stat'ed the file.
+    """
+    try:
+        st = stat_result or os.stat(file_path)
+        # Copy so callers cannot mutate the cached entry
+        return dict(_get_video_info_cached(file_path, st.st_size, st.st_mtime_ns))
     except Exception as e:
         logger.warning(f"Could not get video info: {e}")
     return {"duration": 0}
@@ -78,6 +492,16 @@ def process_video_job(job_id, file_path, options, settings, job_store):
     """
     job_store.update_job(job_id, status="running", progress=0)
 
+    # Intermediate progress is written at most every _PROGRESS_INTERVAL;
+    # the running/completed/failed transitions are always written
+    last_progress = {"time": time.monotonic(), "value": 0}
+
+    def _set_progress(value):
+        now = time.monotonic()
+        if value != last_progress["value"] and now - last_progress["time"] >= _PROGRESS_INTERVAL:
+            last_progress.update(time=now, value=value)
+            job_store.update_job(job_id, progress=value)
+
     result = {
         "job_id": job_id,
         "original_file": os.path.basename(file_path),
@@ -85,108 +509,130 @@ def process_video_job(job_id, file_path, options, settings, job_store):
         "errors": [],
     }
 
+    staged_paths = []
+    tmpfs_reserved = 0
+
     try:
-        # Parse options
-        conv_options = VideoConversionOptions(
-            output_format=options.get("output_format", "mp4"),
-            quality=options.get("quality", "medium"),
-        )
+        # Parse options (already validated when the job was submitted)
+        conv_options = validate_options(options)
+        format_settings = OUTPUT_FORMAT_MAP[conv_options.output_format]
 
-        job_store.update_job(job_id, progress=5)
+        _set_progress(5)
 
         # Get video info
-        video_info = get_video_info(file_path)
+        input_stat = os.stat(file_path)
+        video_info = get_video_info(file_path, input_stat)
         result["input_duration"] = video_info.get("duration", 0)
         result["input_width"] = video_info.get("width")
         result["input_height"] = video_info.get("height")
 
-        job_store.update_job(job_id, progress=10)
-
-        # Determine output format settings
-        format_settings = OUTPUT_FORMAT_MAP.get(conv_options.output_format)
-        if not format_settings:
-            raise ValueError(f"Unsupported output format: {conv_options.output_format}")
-
-        quality_settings = QUALITY_PRESETS.get(conv_options.quality, QUALITY_PRESETS["medium"])
+        _set_progress(10)
 
         output_ext = format_settings["ext"]
         output_path = video_result_path(settings.result_dir, job_id, output_ext)
 
-        job_store.update_job(job_id, progress=15)
-
-        # Build FFmpeg command
-        cmd = ["ffmpeg", "-y", "-i", file_path]
-
-        # Add video codec settings
-        if format_settings["vcodec"] == "gif":
-            # Special handling for GIF - create palette for better quality
-            cmd.extend([
-                "-vf", "fps=10,scale=480:-1:flags=lanczos",
-                "-loop", "0"
-            ])
-        else:
-            cmd.extend(["-c:v", format_settings["vcodec"]])
+        # Small jobs can read and write on tmpfs so FFmpeg never waits on
+        # slow or networked storage; the output is moved into place afterwards
+        encode_input, encode_output = file_path, output_path
+        tmpfs_reserved = _reserve_tmpfs(input_stat.st_size, settings)
+        if tmpfs_reserved:
+            try:
+                encode_input, encode_output = _stage_input(file_path, output_ext)
+                staged_paths.extend([encode_input, encode_output])
+            except OSError as e:
+                logger.warning(f"Could not stage {job_id} on tmpfs, encoding in place: {e}")
+
+        # H.264 going into an H.264 container at the default quality only
+        # needs remuxing: copy the video stream instead of re-encoding it
+        remux = result["remux"] = (
+            not conv_options.force_reencode
+            and conv_options.quality == "medium"
+            and format_settings["vcodec"] == "libx264"
+            and video_info.get("codec") == "h264"
+        )
+        if not remux:
+            conv_options.hwaccel = _select_hwaccel(settings, format_settings)
+        hwaccel = result["hwaccel"] = conv_options.hwaccel
 
-            # Add quality settings for supported codecs
-            if format_settings["vcodec"] in ("libx264", "libx265"):
-                cmd.extend([
-                    "-crf", quality_settings["crf"],
-                    "-preset", quality_settings["preset"]
-                ])
-            elif format_settings["vcodec"] == "libvpx-vp9":
-                # VP9 uses different quality settings
-                crf = quality_settings["crf"]
-                cmd.extend(["-crf", crf, "-b:v", "0"])
+        _set_progress(15)
 
-        # Add audio codec if applicable
-        if format_settings["acodec"]:
-            cmd.extend(["-c:a", format_settings["acodec"]])
-            if format_settings["acodec"] in ("aac", "libopus"):
-                cmd.extend(["-b:a", "192k"])
-        elif format_settings["vcodec"] == "gif":
-            cmd.extend(["-an"])  # No audio for GIF
+        threads = getattr(settings, "ffmpeg_threads", 0)
 
-        cmd.append(output_path)
+        _set_progress(20)
 
-        logger.info(f"Converting video: {' '.join(cmd)}")
+        # Map encode progress onto 20-85%
+        def _on_progress(ratio):
+            _set_progress(int(20 + 65 * ratio))
 
-        job_store.update_job(job_id, progress=20)
+        # Run FFmpeg
+        duration = result["input_duration"]
+        timeout = _encode_timeout(duration, getattr(settings, "video_max_timeout", 3600))
+        log_path = ffmpeg_log_path(settings.result_dir, job_id)
+
+        def _encode(src, dst):
+            nonlocal hwaccel, remux
+            cmd = _build_ffmpeg_cmd(
+                src, dst, conv_options.output_format, conv_options.quality, hwaccel, threads, copy_video=remux,
+            )
+            returncode = _run_ffmpeg(cmd, log_path, duration, _on_progress, timeout)
+
+            if returncode != 0 and (hwaccel or remux):
+                # A GPU that passed the probe can still refuse a job (session
+                # limits, unsupported input), and some streams cannot be copied
+                # into the target container; redo it as a software encode
+                method = "remux" if remux else f"{hwaccel} encode"
+                logger.warning(f"{method} failed for {job_id}, retrying in software: {_tail_log(log_path, 500)}")
+                hwaccel = result["hwaccel"] = None
+                remux = result["remux"] = False
+                cmd = _build_ffmpeg_cmd(src, dst, conv_options.output_format, conv_options.quality, threads=threads)
+                returncode = _run_ffmpeg(cmd, log_path, duration, _on_progress, timeout)
+            return returncode
 
         # Run FFmpeg
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        returncode = _encode(encode_input, encode_output)
+
+        if returncode != 0 and encode_output != output_path:
+            # tmpfs may have filled up (other jobs, an output larger than
+            # reserved); redo the encode in the results directory
+            logger.warning(f"Staged encode failed for {job_id}, retrying in place: {_tail_log(log_path, 500)}")
+            for path in staged_paths:
+                os.remove(path)
+            staged_paths.clear()
+            encode_input, encode_output = file_path, output_path
+            returncode = _encode(encode_input, encode_output)
 
-        # Wait for completion (could add progress parsing here)
-        stdout, stderr = process.communicate(timeout=600)  # 10 minute timeout
+        if returncode != 0:
+            # The full log stays on disk until cleanup removes the job
+            raise RuntimeError(f"FFmpeg failed: {_tail_log(log_path)}")
 
-        if process.returncode != 0:
-            raise RuntimeError(f"FFmpeg failed: {stderr}")
+        os.remove(log_path)
+        if encode_output != output_path:
+            shutil.move(encode_output, output_path)
 
-        job_store.update_job(job_id, progress=85)
+        _set_progress(85)
 
         result["output_path"] = output_path
         result["output_format"] = conv_options.output_format
 
         # Get output file size
-        if os.path.exists(output_path):
-            result["file_size_bytes"] = os.path.getsize(output_path)
+        try:
+            st = os.stat(output_path)
+        except FileNotFoundError:
+            st = None
+        if st is not None:
+            result["file_size_bytes"] = st.st_size
 
             # Get output video info
-            output_info = get_video_info(output_path)
+            output_info = get_video_info(output_path, st)
             result["output_duration"] = output_info.get("duration", 0)
             result["output_width"] = output_info.get("width")
             result["output_height"] = output_info.get("height")
 
-        job_store.update_job(job_id, progress=90)
+        _set_progress(90)
 
         # Persist result JSON
         result_json_path = os.path.join(settings.result_dir, f"{job_id}.json")
-        with open(result_json_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2)
+        write_json_atomic(result_json_path, result)
 
         job_store.update_job(
             job_id,
@@ -198,9 +644,9 @@ def process_video_job(job_id, file_path, options, settings, job_store):
 
         logger.info(f"Video conversion completed: {job_id}")
 
-    except subprocess.TimeoutExpired:
+    except subprocess.TimeoutExpired as e:
         logger.exception(f"Video conversion timed out: {job_id}")
-        result["errors"].append("Conversion timed out (max 10 minutes)")
+        result["errors"].append(f"Conversion timed out (max {int(e.timeout)} seconds)")
         job_store.update_job(
             job_id,
             status="failed",
@@ -216,3 +662,11 @@ def process_video_job(job_id, file_path, options, settings, job_store):
             progress=100,
             error=str(e),
         )
+    finally:
+        for path in staged_paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        if tmpfs_reserved:
+            _release_tmpfs(tmpfs_reserved)